@@ -1,19 +1,40 @@
-import pandas as pd
+# Summary stats on simulation results
+import argparse
 import os
 from datetime import datetime
 
+from src.model.monte_carlo import STATS, COMBOS
 from src.utils.constants import TEAM1, TEAM2
+from src.utils.helpers import load_simulation_results, load_simulation_summaries, summary_stats
+from src.utils.results_io import results_path
 
-#date_str = datetime.today().strftime('%Y-%m-%d')
-date_str = input("Enter date for analysis: YYYY-MM-DD \n")
-# Reuse your folder name
-folder_name = f"{TEAM1.lower()}_vs_{TEAM2.lower()}_{date_str}"
-output_folder = os.path.join('sim_results', folder_name)
-combined_path = os.path.join(output_folder, f"{TEAM1.lower()}_vs_{TEAM2.lower()}_combined_simulations.csv")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summary stats for a saved matchup simulation")
+    parser.add_argument('--team1', default=TEAM1, help="First team of the matchup (default: %(default)s)")
+    parser.add_argument('--team2', default=TEAM2, help="Second team of the matchup (default: %(default)s)")
+    parser.add_argument('--date', default=datetime.today().strftime('%Y-%m-%d'), help="Simulation date, YYYY-MM-DD (default: today)")
+    parser.add_argument('--player', action='append', help="Only summarize this player (repeatable)")
+    parser.add_argument('--columns', nargs='+', default=['PTS', 'REB', 'AST'], choices=STATS + list(COMBOS),
+                        help="Stat columns to summarize, combos included (default: %(default)s)")
+    args = parser.parse_args()
 
-# Load CSV
-df_combined = pd.read_csv(combined_path)
+    # Reuse your folder name
+    folder_name = f"{args.team1.lower()}_vs_{args.team2.lower()}_{args.date}"
+    output_folder = os.path.join('sim_results', folder_name)
 
-# View summary stats
-summary_df = df_combined.groupby('PLAYER')[['PTS', 'REB', 'AST']].agg(['mean', 'std', 'min', 'max', 'median'])
-print(summary_df.round(2))
\ No newline at end of file
+    # Streaming runs keep summaries instead of trials
+    summaries = load_simulation_summaries(output_folder, args.team1, args.team2, players=args.player)
+    if summaries is not None:
+        summary_df = summary_stats(summaries, args.columns)
+    else:
+        # Load only the requested players and stat columns
+        try:
+            df_combined, _ = load_simulation_results(output_folder, args.team1, args.team2,
+                                                     players=args.player, columns=args.columns)
+        except FileNotFoundError:
+            parser.exit(1, f"No simulation results for {args.team1} vs {args.team2} on {args.date}: "
+                           f"expected {results_path(output_folder, args.team1, args.team2)}\n")
+        summary_df = df_combined.groupby('PLAYER', observed=True)[args.columns].agg(['mean', 'std', 'min', 'max', 'median'])
+
+    # View summary stats
+    print(summary_df.round(2))
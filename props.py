@@ -0,0 +1,53 @@
+# Prop-line probabilities from saved simulation results
+import argparse
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.model.props import query_lines
+from src.utils.constants import TEAM1, TEAM2
+from src.utils.results_io import results_path, summaries_path, load_player_results, load_summaries
+
+def parse_line(text):
+    # "Player Name:STAT:LINE"
+    player, stat, line = text.rsplit(':', 2)
+    return {'PLAYER': player, 'STAT': stat.upper(), 'LINE': float(line)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Over/under probabilities for prop lines from a saved simulation")
+    parser.add_argument('--team1', default=TEAM1, help="First team of the matchup (default: %(default)s)")
+    parser.add_argument('--team2', default=TEAM2, help="Second team of the matchup (default: %(default)s)")
+    parser.add_argument('--date', default=datetime.today().strftime('%Y-%m-%d'), help="Simulation date, YYYY-MM-DD (default: today)")
+    parser.add_argument('--line', action='append', default=[], type=parse_line,
+                        help='A prop as "Player Name:STAT:LINE", e.g. "Napheesa Collier:PRA:34.5" (repeatable)')
+    parser.add_argument('--lines', help="CSV of props with PLAYER, STAT and LINE columns")
+    parser.add_argument('--out', help="Write the result table to this CSV")
+    args = parser.parse_args()
+
+    queries = pd.DataFrame(args.line, columns=['PLAYER', 'STAT', 'LINE'])
+    if args.lines:
+        queries = pd.concat([queries, pd.read_csv(args.lines)], ignore_index=True)
+    if queries.empty:
+        parser.error("give at least one --line or a --lines file")
+
+    output_folder = os.path.join('sim_results', f"{args.team1.lower()}_vs_{args.team2.lower()}_{args.date}")
+    path = results_path(output_folder, args.team1, args.team2)
+    stream_path = summaries_path(output_folder, args.team1, args.team2)
+    if os.path.exists(path):
+        results = load_player_results(path, players=set(queries['PLAYER']))
+    elif os.path.exists(stream_path):
+        # Streaming runs keep per-player histograms instead of trials
+        results = load_summaries(stream_path, players=set(queries['PLAYER']))
+    else:
+        parser.exit(1, f"No simulation results for {args.team1} vs {args.team2} on {args.date}: "
+                       f"expected {path} (or {stream_path} from a streaming run)\n")
+    table = query_lines(results, queries)
+
+    missing = sorted(set(queries['PLAYER']) - set(results))
+    if missing:
+        print(f"No simulation results for: {', '.join(missing)}")
+    print(table.round(3).to_string(index=False))
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"Saved: {args.out}")
@@ -0,0 +1,50 @@
+# Simulate a full day of games in one run
+import argparse
+import json
+
+from src.utils.constants import SIMULATION_DEFAULTS
+from src.utils.helpers import make_game, run_slate
+
+def parse_pair(text):
+    # "Team:Name"
+    first, second = text.split(':', 1)
+    return first.strip(), second.strip()
+
+def game_from_config(team_1, team_2, players):
+    """players maps team nicknames to their target players"""
+    target_players = {'TEAM1': list(players.get(team_1, [])), 'TEAM2': list(players.get(team_2, []))}
+    return make_game(team_1, team_2, target_players)
+
+def load_slate(path):
+    with open(path) as f:
+        config = json.load(f)
+    games = [game_from_config(game['team1'], game['team2'], game.get('players', {})) for game in config['games']]
+    return games, config.get('date')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate every target player of a slate of games")
+    parser.add_argument('config', nargs='?', help="JSON slate file with a list of games and their target players")
+    parser.add_argument('--game', action='append', default=[], type=parse_pair,
+                        help='A game as "Team1:Team2", e.g. "Lynx:Mercury" (repeatable)')
+    parser.add_argument('--player', action='append', default=[], type=parse_pair,
+                        help='A target player as "Team:Player Name" (repeatable)')
+    parser.add_argument('--date', help="Date used in output folder names, YYYY-MM-DD (default: today)")
+    parser.add_argument('--workers', type=int, help="Processes used to simulate players")
+    parser.add_argument('--n-simulations', type=int, help="Trials per player")
+    parser.add_argument('--engine', choices=['player', 'game'], help="Simulation engine")
+    args = parser.parse_args()
+
+    games, date_str = load_slate(args.config) if args.config else ([], None)
+    players = {}
+    for team, player_name in args.player:
+        players.setdefault(team, []).append(player_name)
+    games += [game_from_config(team_1, team_2, players) for team_1, team_2 in args.game]
+    if not games:
+        parser.error("give a slate file or at least one --game")
+
+    # Command-line overrides of the simulation settings
+    for key in ['workers', 'n_simulations', 'engine']:
+        if getattr(args, key) is not None:
+            SIMULATION_DEFAULTS[key] = getattr(args, key)
+
+    run_slate(games, args.date or date_str)
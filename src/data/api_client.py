@@ -1,95 +1,315 @@
-from nba_api.stats.endpoints import LeagueDashTeamStats, commonteamroster, commonplayerinfo
+from nba_api.stats.endpoints import (LeagueDashTeamStats, ScheduleLeagueV2, commonteamroster, commonplayerinfo,
+                                     playergamelog, playergamelogs)
 from nba_api.stats.static import players
+import random
+import threading
 import time
+import requests
+
+from src.utils.constants import SIMULATION_DEFAULTS, DATA_SETTINGS, API_SETTINGS
+
+# Request gateway: every endpoint call is rate limited and retried here
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping only as long as the budget requires"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token up front so concurrent callers queue in order
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+rate_limiter = TokenBucket(API_SETTINGS['requests_per_second'], API_SETTINGS['burst'])
+
+class ThrottledResponse(Exception):
+    """The API answered with a rate-limit or server error status instead of data"""
+
+# Timeouts, dropped connections and throttled/server-error responses are worth
+# retrying; parse errors on a good response are not
+TRANSIENT_ERRORS = (requests.exceptions.RequestException, ThrottledResponse)
+
+def backoff_delay(attempt):
+    cap = min(API_SETTINGS['backoff_max'], API_SETTINGS['backoff_base'] * 2 ** attempt)
+    return cap / 2 + random.uniform(0, cap / 2)
+
+def call_endpoint(endpoint, **params):
+    """One request; raises ThrottledResponse when the status says to try again"""
+    call = endpoint(**params, timeout=API_SETTINGS['timeout'], get_request=False)
+    try:
+        call.get_request()
+    except ValueError:
+        # The stats API sends non-JSON bodies with its throttling and error statuses
+        response = getattr(call, 'nba_response', None)
+        status = getattr(response, '_status_code', None)
+        if status in API_SETTINGS['retry_statuses']:
+            raise ThrottledResponse(f"HTTP {status}")
+        raise
+    return call.get_data_frames()
+
+def request_frames(endpoint, **params):
+    """Call an endpoint under the shared rate limit, retrying transient errors"""
+    max_retries = API_SETTINGS['max_retries']
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire()
+        try:
+            return call_endpoint(endpoint, **params)
+        except TRANSIENT_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"{endpoint.__name__} failed ({e}), retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
 
 # NBA API interaction functions
 
+def fetch_frames(endpoint, use_cache=True, **params):
+    """Fetch an endpoint's data frames once per run, backed by the disk cache.
+
+    use_cache=False always goes to the API (or fixtures in replay mode) and
+    refreshes the disk cache with the answer; syncs use it to see new games.
+    """
+    from src.data.cache import response_cache, normalize_params
+    from src.data.replay import load_fixture, record_fixture
+    from src.data.store import run_store
+
+    name = endpoint.__name__
+    mode = API_SETTINGS['mode']
+
+    def load():
+        if mode == 'replay':
+            return load_fixture(name, params)
+        frames = response_cache.get(name, params) if use_cache else None
+        if frames is None:
+            frames = request_frames(endpoint, **params)
+            response_cache.put(name, params, frames)
+        if mode == 'record':
+            record_fixture(name, params, frames)
+        return frames
+
+    if not use_cache:
+        return load()
+    key = (name, tuple(normalize_params(params).items()))
+    return run_store.get(key, load)
+
+# Endpoint requests the model makes, shared by the fetchers below and the prefetch planner
+
+def player_gamelog_request(player_id, season):
+    return playergamelog.PlayerGameLog, {
+        'player_id': player_id,
+        'season': season,
+        'season_type_all_star': 'Regular Season',
+        'league_id_nullable': '10'
+    }
+
+def league_gamelog_request(season):
+    return playergamelogs.PlayerGameLogs, {
+        'season_nullable': season,
+        'season_type_nullable': 'Regular Season',
+        'league_id_nullable': '10'
+    }
+
+def player_info_request(player_id):
+    return commonplayerinfo.CommonPlayerInfo, {
+        'player_id': player_id,
+        'league_id_nullable': '10'  # WNBA
+    }
+
+def roster_request(team_id):
+    return commonteamroster.CommonTeamRoster, {
+        'team_id': team_id,
+        'season': '2025',
+        'league_id_nullable': '10'
+    }
+
+def team_stats_request(opp_id):
+    return LeagueDashTeamStats, {
+        'season': '2024',
+        'season_type_all_star': 'Regular Season',
+        'league_id_nullable': '10',  # '10' = WNBA
+        'per_mode_detailed': 'PerGame',
+        'measure_type_detailed_defense': 'Base',
+        'last_n_games': 10,
+        'pace_adjust': 'N',
+        'plus_minus': 'N',
+        'rank': 'N',
+        'month': 0,
+        'period': 0,
+        'opponent_team_id': opp_id
+    }
+
+def schedule_request(season):
+    return ScheduleLeagueV2, {
+        'league_id': '10',
+        'season': season
+    }
+
+def fetch_request(request, use_cache=True):
+    endpoint, params = request
+    return fetch_frames(endpoint, use_cache=use_cache, **params)
+
+def get_player_gamelog(player_id, season=None):
+    """Regular season game log for one player, most recent game first"""
+    from src.data.data_processor import normalize_gamelog
+    from src.data.store import run_store
+
+    season = season or SIMULATION_DEFAULTS['season']
+    if DATA_SETTINGS['season_store'] or DATA_SETTINGS['gamelog_source'] == 'league':
+        logs_by_player = get_league_gamelogs_by_player(season)
+        if player_id in logs_by_player:
+            return logs_by_player[player_id]
+        return get_league_gamelogs(season).iloc[0:0]
+
+    return run_store.get(('player_gamelog', player_id, season), lambda: normalize_gamelog(
+        fetch_request(player_gamelog_request(player_id, season))[0]))
+
+def get_league_gamelogs(season=None):
+    """Every WNBA player's regular season game log, from the season store or one bulk request"""
+    from src.data.data_processor import normalize_gamelog
+    from src.data.season_store import load_gamelogs
+    from src.data.store import run_store
+
+    season = season or SIMULATION_DEFAULTS['season']
+    if DATA_SETTINGS['season_store']:
+        return run_store.get(('league_gamelogs', season), lambda: normalize_gamelog(load_gamelogs(season)))
+    return run_store.get(('league_gamelogs', season), lambda: normalize_gamelog(
+        fetch_request(league_gamelog_request(season))[0]))
+
+def get_league_gamelogs_by_player(season=None):
+    # Split the league frame once so per-player lookups are dict hits
+    from src.data.store import run_store
+
+    season = season or SIMULATION_DEFAULTS['season']
+    return run_store.get(('league_gamelogs_by_player', season), lambda: {
+        pid: log.reset_index(drop=True)
+        for pid, log in get_league_gamelogs(season).groupby('PLAYER_ID', sort=False)
+    })
+
+def get_player_info(player_id):
+    return fetch_request(player_info_request(player_id))[0]
+
 def get_position(player_id):
+    from src.data.metadata import get_player_index
+    index = get_player_index()
+    if player_id in index:
+        return index.position(player_id)
     try:
-        df = commonplayerinfo.CommonPlayerInfo(
-            player_id=player_id,
-            league_id_nullable='10'  # WNBA
-        ).get_data_frames()[0]
-        time.sleep(1)
+        df = get_player_info(player_id)
         return df['POSITION'].iloc[0]
     except:
         return None
 
 def parse_height(height_str):
-    if not height_str or '-' not in height_str:
+    if not isinstance(height_str, str) or '-' not in height_str:
         return 72  # default 6'0" if unknown
     feet, inches = map(int, height_str.split('-'))
     return feet * 12 + inches
         
 def get_player_height_and_position(pid):
+    from src.data.metadata import get_player_index
+    index = get_player_index()
+    if pid in index:
+        return index.height(pid), index.position(pid) or 'G'
     try:
-        df = commonplayerinfo.CommonPlayerInfo(player_id=pid, league_id_nullable='10').get_data_frames()[0]
+        df = get_player_info(pid)
         height = parse_height(df['HEIGHT'].iloc[0])
         position = df['POSITION'].iloc[0]
-        time.sleep(1)
         return height, position
     except:
         return 72, 'G'  # Default values
         
 def team_lookup(team_id):
-    return commonteamroster.CommonTeamRoster(
-        team_id=team_id,
-        season='2025',
-        league_id_nullable='10'
-    )
+    if DATA_SETTINGS['season_store']:
+        from src.data.season_store import load_roster
+        from src.data.store import run_store
+        season = SIMULATION_DEFAULTS['season']
+        roster_df = run_store.get(('stored_roster', season, team_id), lambda: load_roster(team_id, season))
+        if not roster_df.empty:
+            return roster_df
+    return fetch_request(roster_request(team_id))[0]
+
+def get_game_end_times(season=None):
+    """Sorted UTC timestamps at which each scheduled game should be final"""
+    import numpy as np
+    import pandas as pd
+    from src.data.store import run_store
+    from src.utils.constants import CACHE_SETTINGS
+
+    season = season or SIMULATION_DEFAULTS['season']
+
+    def load():
+        schedule = next(f for f in fetch_request(schedule_request(season)) if 'gameDateTimeUTC' in f.columns)
+        tip_offs = pd.to_datetime(schedule['gameDateTimeUTC'], utc=True, errors='coerce').dropna()
+        return np.sort(tip_offs.map(pd.Timestamp.timestamp).to_numpy(dtype=float) + CACHE_SETTINGS['game_length'])
+
+    return run_store.get(('game_end_times', season), load)
+
+def get_team_stats(opp_id):
+    """League team stats (last 10 games) against one opponent"""
+    if DATA_SETTINGS['season_store']:
+        from src.data.season_store import load_team_stats
+        from src.data.store import run_store
+        season = SIMULATION_DEFAULTS['season']
+        stats_df = run_store.get(('stored_team_stats', season, opp_id), lambda: load_team_stats(opp_id, season))
+        if not stats_df.empty:
+            return stats_df
+    return fetch_request(team_stats_request(opp_id))[0]
 
 def player_id_to_name(id):
-    time.sleep(1)
-    return players.find_wnba_player_by_id(id)['full_name']
+    from src.data.metadata import get_player_index
+    return get_player_index().name(id)
 
 def get_player_name(player_id):
-    time.sleep(1)
-    player = players.find_wnba_player_by_id(player_id)
-    return player['full_name'] if player is not None else "Empty"
+    from src.data.metadata import get_player_index
+    name = get_player_index().name(player_id)
+    return name if name is not None else "Empty"
+
+def find_player_id(full_name):
+    """Player ID for a full name (accent/case/punctuation-insensitive), or None"""
+    from src.data.metadata import get_player_index
+    player_id = get_player_index().find_id(full_name)
+    if player_id is None:
+        matches = players.find_wnba_players_by_full_name(full_name)
+        player_id = matches[0]['id'] if matches else None
+    return player_id
+
+def team_roster_ids(team_id):
+    """Player IDs on a team's roster; the one roster every per-team table is built from"""
+    from src.data.metadata import get_player_index
+    team_player_ids = get_player_index().roster(team_id)
+    if not team_player_ids:
+        team_player_ids = team_lookup(team_id)['PLAYER_ID'].tolist()
+    return team_player_ids
 
 def get_team_ids_from_player_id(id, ignore_id=None):
-    player_stats = commonplayerinfo.CommonPlayerInfo(
-         player_id=id,
-         league_id_nullable='10'
-    ).get_data_frames()[0]
-    team_id = player_stats['TEAM_ID'].iloc[0]
-    roster_team_df = team_lookup(team_id).get_data_frames()[0]
-    team_player_ids = roster_team_df['PLAYER_ID'].tolist()
+    team_player_ids = team_roster_ids(get_team_id_from_player_id(id))
     if ignore_id and ignore_id in team_player_ids:
         team_player_ids.remove(ignore_id)
     return team_player_ids
 
 def get_team_id_from_player_id(id):
-    player_stats = commonplayerinfo.CommonPlayerInfo(
-         player_id=id,
-         league_id_nullable='10'
-    ).get_data_frames()[0]
+    from src.data.metadata import get_player_index
+    team_id = get_player_index().team_id(id)
+    if team_id is not None:
+        return team_id
+    player_stats = get_player_info(id)
     return player_stats['TEAM_ID'].iloc[0]
 
 # API data fetching
 def calculate_team_possessions(home_id, opp_id):
-    common_params = {
-        'season': '2024', 
-        'season_type_all_star': 'Regular Season',
-        'league_id_nullable': '10',  # '10' = WNBA
-        'per_mode_detailed': 'PerGame',
-        'measure_type_detailed_defense': 'Base',
-        'last_n_games': 10,
-        'pace_adjust': 'N',
-        'plus_minus': 'N',
-        'rank': 'N',
-        'month': 0,
-        'period': 0 
-    }
-    hts = LeagueDashTeamStats( 
-        **common_params,
-        opponent_team_id=opp_id
-    ).get_data_frames()[0]
+    hts = get_team_stats(opp_id)
     filt_hts = hts[hts['TEAM_ID'] == home_id]
-    ots = LeagueDashTeamStats( 
-        **common_params,
-        opponent_team_id=home_id
-    ).get_data_frames()[0]
+    ots = get_team_stats(home_id)
     filt_ots = ots[ots['TEAM_ID'] == opp_id]
 
     team_possession = 0.5 * (
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from src.utils.constants import CACHE_SETTINGS
+
+# On-disk response cache for nba_api endpoints
+
+def normalize_params(params):
+    """Normalize endpoint parameters so equivalent calls share a key"""
+    return {k: str(v) for k, v in sorted(params.items()) if v is not None}
+
+def request_key(endpoint, params):
+    """Stable hash of an endpoint name and its normalized parameters"""
+    payload = json.dumps([endpoint, normalize_params(params)])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+# Evictions trim the cache to this fraction of max_bytes, so a full cache is
+# not swept again on the very next write
+EVICT_TARGET = 0.9
+
+def midnight_expiry(now=None):
+    now = now or datetime.now()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+def next_game_expiry(game_end_times, now=None):
+    # Game logs and team stats only change when a game finishes, so an entry
+    # stays valid until the next scheduled game is over
+    now = time.time() if now is None else now
+    upcoming = game_end_times[game_end_times > now]
+    return float(upcoming[0]) if len(upcoming) else None
+
+def schedule_expiry():
+    """Expiry for 'next_game' entries: the end of the next game, or midnight without a schedule"""
+    from src.data.api_client import get_game_end_times
+    try:
+        expiry = next_game_expiry(get_game_end_times())
+    except Exception as e:
+        print(f"Schedule unavailable ({e}), cache entries expire at midnight")
+        expiry = None
+    return expiry if expiry is not None else midnight_expiry()
+
+class ResponseCache:
+    def __init__(self, cache_dir, ttls, max_bytes, enabled=True):
+        self.cache_dir = cache_dir
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.size = None  # bytes on disk, learned on the first write
+        self._lock = threading.Lock()
+
+    def path(self, endpoint, params):
+        return os.path.join(self.cache_dir, endpoint, f"{request_key(endpoint, params)}.pkl")
+
+    def expires_at(self, endpoint):
+        ttl = self.ttls.get(endpoint, self.ttls.get('default', 0))
+        if ttl == 'next_game':
+            return schedule_expiry()
+        return time.time() + ttl
+
+    def get(self, endpoint, params):
+        """Return cached frames for this call, or None on a miss"""
+        if not self.enabled:
+            return None
+        path = self.path(endpoint, params)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self._record(self.misses, endpoint)
+            return None
+
+        if entry['expires_at'] < time.time():
+            self._remove(path)
+            self._record(self.misses, endpoint)
+            return None
+
+        # Touch the entry so eviction drops least recently used files first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._record(self.hits, endpoint)
+        return entry['frames']
+
+    def put(self, endpoint, params, frames):
+        if not self.enabled:
+            return
+        path = self.path(endpoint, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            'endpoint': endpoint,
+            'params': normalize_params(params),
+            'expires_at': self.expires_at(endpoint),
+            'frames': frames
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+        # Track the size as files are written and only walk the directory when
+        # it may have grown past max_bytes (overwrites are counted twice, which
+        # at worst triggers an early eviction)
+        with self._lock:
+            if self.size is not None:
+                self.size += os.path.getsize(path)
+        if self.size is None or self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used entries once the cache is over max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for fname in files:
+                    if not fname.endswith('.pkl'):
+                        continue
+                    fpath = os.path.join(root, fname)
+                    try:
+                        stat = os.stat(fpath)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, fpath))
+                    total += stat.st_size
+
+            if total > self.max_bytes:
+                for _, size, fpath in sorted(entries):
+                    self._remove(fpath)
+                    total -= size
+                    if total <= self.max_bytes * EVICT_TARGET:
+                        break
+            self.size = total
+
+    def clear(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for fname in files:
+                self._remove(os.path.join(root, fname))
+        self.size = 0
+
+    def report(self):
+        """Print cache hits and misses per endpoint"""
+        endpoints = sorted(set(self.hits) | set(self.misses))
+        if not endpoints:
+            print("Cache: no endpoint calls this run")
+            return
+        print("CACHE REPORT")
+        for endpoint in endpoints:
+            hits = self.hits[endpoint]
+            misses = self.misses[endpoint]
+            rate = hits / (hits + misses) * 100
+            print(f"  {endpoint}: {hits} hits, {misses} misses ({rate:.0f}% hit rate)")
+        total_hits = sum(self.hits.values())
+        total_misses = sum(self.misses.values())
+        print(f"  Total: {total_hits} hits, {total_misses} misses")
+
+    def _record(self, counter, endpoint):
+        with self._lock:
+            counter[endpoint] += 1
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+response_cache = ResponseCache(
+    cache_dir=CACHE_SETTINGS['cache_dir'],
+    ttls=CACHE_SETTINGS['ttl'],
+    max_bytes=CACHE_SETTINGS['max_bytes'],
+    enabled=CACHE_SETTINGS['enabled']
+)
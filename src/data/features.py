@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.constants import DATA_SETTINGS, SIMULATION_DEFAULTS
+
+# Feature store: every player's rolling features for every game of the season,
+# computed in one grouped pass over the league game log. A row's features cover
+# that game and the window - 1 games before it, so the row with AS_OF_DATE d is
+# what the model sees after the game on d
+
+STATS = ['PTS', 'REB', 'AST']
+SUM_COLS = ['FGM', 'FG3M', 'FGA', 'FTM', 'FTA', 'TOV', 'MIN', 'PTS', 'REB', 'AST']
+CORR_PAIRS = [('PTS', 'REB'), ('PTS', 'AST'), ('REB', 'AST')]
+
+def rolling_sums(df, cols, window):
+    # Windowed sums per player as differences of grouped cumulative sums
+    cumulative = df[cols].groupby(df['PLAYER_ID']).cumsum()
+    lagged = cumulative.groupby(df['PLAYER_ID']).shift(window).fillna(0.0)
+    return cumulative - lagged
+
+def safe_ratio(num, den, default=np.nan):
+    return pd.Series(np.where(den > 0, num / den.where(den > 0, 1), default), index=num.index)
+
+def compute_rolling_features(gamelogs, window=None):
+    """Rolling per-player features indexed by (PLAYER_ID, AS_OF_DATE)"""
+    window = window or SIMULATION_DEFAULTS['recent_games']
+    df = gamelogs.sort_values(['PLAYER_ID', 'GAME_DATE'], ignore_index=True)
+    for col in SUM_COLS:
+        df[col] = df[col].astype(float)
+
+    # Squares, zero indicators and cross products turn stds, zero rates and
+    # correlations into windowed sums too
+    extra = {}
+    for stat in STATS:
+        extra[f'{stat}_SQ'] = df[stat] ** 2
+        extra[f'{stat}_ZERO'] = (df[stat] == 0).astype(float)
+    for a, b in CORR_PAIRS:
+        extra[f'{a}_{b}'] = df[a] * df[b]
+    df = df.assign(**extra)
+
+    sums = rolling_sums(df, SUM_COLS + list(extra), window)
+    n = np.minimum(df.groupby('PLAYER_ID').cumcount() + 1, window).astype(float)
+
+    features = pd.DataFrame({'PLAYER_ID': df['PLAYER_ID'], 'AS_OF_DATE': df['GAME_DATE'], 'GAMES': n})
+    features['EFG'] = safe_ratio(sums['FGM'] + 0.5 * sums['FG3M'], sums['FGA'])
+    features['FT_PCT'] = safe_ratio(sums['FTM'], sums['FTA'], 0.8)
+    features['FTA_PER_MIN'] = safe_ratio(sums['FTA'], sums['MIN'], 0.0)
+    for stat in STATS:
+        features[f'{stat}_MEAN'] = sums[stat] / n
+    for stat in STATS:
+        var = (sums[f'{stat}_SQ'] - sums[stat] ** 2 / n) / (n - 1)
+        features[f'{stat}_STD'] = np.sqrt(var.clip(lower=0)).where(n > 1)
+    for stat in STATS:
+        features[f'{stat}_ZERO_RATE'] = sums[f'{stat}_ZERO'] / n
+    for a, b in CORR_PAIRS:
+        cov = sums[f'{a}_{b}'] - sums[a] * sums[b] / n
+        var_a = sums[f'{a}_SQ'] - sums[a] ** 2 / n
+        var_b = sums[f'{b}_SQ'] - sums[b] ** 2 / n
+        # Constant stats have no correlation (0, as the old .corr().fillna(0) gave)
+        denom = np.sqrt(var_a * var_b).where((var_a > 1e-9) & (var_b > 1e-9), 0.0)
+        features[f'CORR_{a}_{b}'] = safe_ratio(cov, denom, 0.0).clip(-1, 1)
+    features['USAGE_POSS'] = (sums['FGA'] + 0.44 * sums['FTA'] + sums['TOV']) / n
+    features['IMPACT'] = features['PTS_MEAN'] + 0.7 * features['AST_MEAN'] + 0.7 * features['REB_MEAN']
+
+    # Segment minutes use the season-to-date average, not the rolling window
+    season_min = df.groupby('PLAYER_ID')['MIN'].cumsum() / (df.groupby('PLAYER_ID').cumcount() + 1)
+    features['SEASON_MIN'] = season_min
+    features['SEGMENT_MIN'] = season_min * (10 / 40)
+    return features.set_index(['PLAYER_ID', 'AS_OF_DATE'])
+
+def write_features(season, features):
+    from src.data.season_store import connect
+
+    df = features.reset_index()
+    df['AS_OF_DATE'] = df['AS_OF_DATE'].dt.strftime('%Y-%m-%d')
+    with connect(season) as conn:
+        df.to_sql('features', conn, if_exists='replace', index=False)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_features_player ON features (PLAYER_ID, AS_OF_DATE)")
+        conn.commit()
+
+def load_features(season):
+    from src.data.season_store import read_table
+
+    df = read_table(season, 'features')
+    if df.empty:
+        return None
+    df['AS_OF_DATE'] = pd.to_datetime(df['AS_OF_DATE'])
+    return df.set_index(['PLAYER_ID', 'AS_OF_DATE'])
+
+def get_feature_table(season=None):
+    """League feature table for the run: read from the season store or computed once"""
+    from src.data.api_client import get_league_gamelogs
+    from src.data.store import run_store
+
+    season = season or SIMULATION_DEFAULTS['season']
+
+    def build():
+        if DATA_SETTINGS['season_store']:
+            stored = load_features(season)
+            if stored is not None:
+                return stored
+        return compute_rolling_features(get_league_gamelogs(season))
+
+    return run_store.get(('feature_table', season), build)
+
+def player_feature_rows(gamelog, player_id):
+    if gamelog.empty:
+        return None
+    return compute_rolling_features(gamelog).xs(player_id, level='PLAYER_ID')
+
+def get_player_features(player_id, as_of=None, season=None):
+    """Latest feature row for a player strictly before as_of (default: latest), or None"""
+    from src.data.api_client import get_player_gamelog
+    from src.data.store import run_store
+
+    season = season or SIMULATION_DEFAULTS['season']
+    if DATA_SETTINGS['season_store'] or DATA_SETTINGS['gamelog_source'] == 'league':
+        table = get_feature_table(season)
+        if player_id not in table.index.get_level_values(0):
+            return None
+        rows = table.xs(player_id, level='PLAYER_ID')
+    else:
+        # Per-player logs: compute this player's features on first use
+        rows = run_store.get(('player_features', player_id, season),
+                             lambda: player_feature_rows(get_player_gamelog(player_id, season), player_id))
+        if rows is None:
+            return None
+
+    if as_of is not None:
+        rows = rows[rows.index < pd.Timestamp(as_of)]
+    return rows.iloc[-1] if not rows.empty else None
+
+def stat_corr(features):
+    """PTS/REB/AST correlation matrix from a feature row"""
+    corr = np.eye(len(STATS))
+    for a, b in CORR_PAIRS:
+        i, j = STATS.index(a), STATS.index(b)
+        corr[i, j] = corr[j, i] = features[f'CORR_{a}_{b}']
+    return corr
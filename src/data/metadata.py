@@ -0,0 +1,99 @@
+import re
+import unicodedata
+
+import pandas as pd
+from nba_api.stats.static import players, teams
+
+from src.utils.constants import DATA_SETTINGS, SIMULATION_DEFAULTS
+
+# Player/team metadata index built once per run from static data and rosters
+
+DEFAULT_HEIGHT = 72  # 6'0" if unknown
+
+def normalize_name(name):
+    """Lowercase, accent- and punctuation-free name for matching"""
+    if not name:
+        return ''
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii')
+    name = re.sub(r"[^a-z0-9 ]", '', name.lower().replace('-', ' '))
+    return ' '.join(name.split())
+
+class PlayerIndex:
+    def __init__(self, player_records, roster_records):
+        self.names = {}
+        self.ids_by_name = {}
+        self.team_ids = {}
+        self.positions = {}
+        self.heights = {}
+        self.rosters = {}
+
+        for record in player_records:
+            self._add_name(record['id'], record['full_name'])
+
+        # Rosters carry team, position and height for every current player
+        for record in roster_records:
+            pid = int(record['PLAYER_ID'])
+            team_id = int(record['TEAM_ID'])
+            self._add_name(pid, record['PLAYER_NAME'])
+            self.team_ids[pid] = team_id
+            self.positions[pid] = record['POSITION'] or None
+            self.heights[pid] = int(record['HEIGHT_IN'])
+            self.rosters.setdefault(team_id, []).append(pid)
+
+    def _add_name(self, pid, name):
+        if not name:
+            return
+        pid = int(pid)
+        self.names.setdefault(pid, name)
+        self.ids_by_name.setdefault(normalize_name(name), pid)
+
+    def name(self, player_id):
+        return self.names.get(player_id)
+
+    def find_id(self, name):
+        return self.ids_by_name.get(normalize_name(name))
+
+    def team_id(self, player_id):
+        return self.team_ids.get(player_id)
+
+    def position(self, player_id):
+        return self.positions.get(player_id)
+
+    def height(self, player_id):
+        return self.heights.get(player_id)
+
+    def roster(self, team_id):
+        return list(self.rosters.get(team_id, []))
+
+    def __contains__(self, player_id):
+        return player_id in self.team_ids
+
+def load_roster_records():
+    """All WNBA rosters as PLAYER_ID, PLAYER_NAME, TEAM_ID, POSITION, HEIGHT_IN rows"""
+    from src.data.api_client import team_lookup, parse_height
+
+    if DATA_SETTINGS['season_store']:
+        from src.data.season_store import load_player_bio
+        bio = load_player_bio()
+        if not bio.empty:
+            return bio.to_dict('records')
+
+    rosters = []
+    for team in teams.get_wnba_teams():
+        try:
+            rosters.append(team_lookup(team['id']))
+        except Exception as e:
+            print(f"Error fetching roster for {team['full_name']}: {e}")
+    if not rosters:
+        return []
+    roster_df = pd.concat(rosters, ignore_index=True).rename(
+        columns={'TeamID': 'TEAM_ID', 'PLAYER': 'PLAYER_NAME'})
+    roster_df['HEIGHT_IN'] = roster_df['HEIGHT'].map(parse_height)
+    return roster_df[['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'POSITION', 'HEIGHT_IN']].to_dict('records')
+
+def build_player_index():
+    return PlayerIndex(players.get_wnba_players(), load_roster_records())
+
+def get_player_index():
+    from src.data.store import run_store
+    return run_store.get(('player_index', SIMULATION_DEFAULTS['season']), build_player_index)
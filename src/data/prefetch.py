@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from nba_api.stats.static import teams
+
+from src.data.api_client import (fetch_request, player_gamelog_request, league_gamelog_request,
+                                 roster_request, schedule_request, team_stats_request)
+from src.utils.constants import API_SETTINGS, DATA_SETTINGS, SIMULATION_DEFAULTS
+
+# Prefetch stage: fetch everything a matchup needs before the model runs
+
+def plan_team_requests(team_pairs, season=None):
+    """Requests that only need team IDs: every roster, each team's stats and the league log.
+
+    These run before the player index is built, since the index is built from
+    the rosters.
+    """
+    season = season or SIMULATION_DEFAULTS['season']
+    if DATA_SETTINGS['season_store']:
+        return []  # everything is read from the local store
+
+    # Every team's roster feeds the player metadata index (names, teams, positions, heights)
+    requests = [roster_request(team['id']) for team in teams.get_wnba_teams()]
+    for team1_id, team2_id in team_pairs:
+        requests += [
+            team_stats_request(team1_id),
+            team_stats_request(team2_id)
+        ]
+    if DATA_SETTINGS['gamelog_source'] == 'league':
+        requests.append(league_gamelog_request(season))
+    # The schedule sets when cached game logs and team stats expire
+    requests.append(schedule_request(season))
+    return unique_requests(requests)
+
+def plan_player_requests(player_ids, season=None):
+    """Per-player game logs, needed only when logs are fetched one player at a time"""
+    season = season or SIMULATION_DEFAULTS['season']
+    if DATA_SETTINGS['season_store'] or DATA_SETTINGS['gamelog_source'] == 'league':
+        return []
+    return [player_gamelog_request(pid, season) for pid in dict.fromkeys(player_ids)]
+
+def plan_matchup_requests(team1_player_ids, team2_player_ids, team1_id, team2_id, season=None):
+    """List every (endpoint, params) request the model makes for this matchup"""
+    return (plan_team_requests([(team1_id, team2_id)], season)
+            + plan_player_requests(team1_player_ids + team2_player_ids, season))
+
+def unique_requests(requests):
+    unique = {}
+    for endpoint, params in requests:
+        unique.setdefault((endpoint.__name__, tuple(sorted(params.items()))), (endpoint, params))
+    return list(unique.values())
+
+def run_prefetch(requests, max_workers=None):
+    """Execute requests on a thread pool; the shared rate limiter paces the network"""
+    if not requests:
+        return 0
+    max_workers = max_workers or API_SETTINGS['prefetch_workers']
+    start = time.perf_counter()
+    failed = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_request, request): request for request in requests}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                # The model refetches (and falls back to defaults) on its own
+                endpoint, params = futures[future]
+                print(f"Prefetch failed for {endpoint.__name__} {params}: {e}")
+                failed += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"Prefetched {len(requests) - failed}/{len(requests)} requests in {elapsed:.1f}s")
+    return failed
+
+def prefetch_matchup(team1_player_ids, team2_player_ids, team1_id, team2_id):
+    requests = plan_matchup_requests(team1_player_ids, team2_player_ids, team1_id, team2_id)
+    return run_prefetch(requests)
+
+def prefetch_teams(team_pairs):
+    """Prefetch the team-level requests of several games at once (before rosters are read)"""
+    return run_prefetch(plan_team_requests(team_pairs))
+
+def prefetch_players(game_rosters):
+    """Prefetch per-player requests for get_team_rosters() tuples, shared players once"""
+    player_ids = [pid for rosters in game_rosters for pid in rosters[0] + rosters[1]]
+    return run_prefetch(plan_player_requests(player_ids))
@@ -0,0 +1,45 @@
+import json
+import os
+from io import StringIO
+
+import pandas as pd
+
+from src.data.cache import normalize_params, request_key
+from src.utils.constants import API_SETTINGS
+
+# Record/replay backend: endpoint responses saved to and served from fixture files
+
+def fixture_path(endpoint, params, fixtures_dir=None):
+    fixtures_dir = fixtures_dir or API_SETTINGS['fixtures_dir']
+    return os.path.join(fixtures_dir, endpoint, f"{request_key(endpoint, params)}.json")
+
+def record_fixture(endpoint, params, frames, fixtures_dir=None):
+    """Save an endpoint response so replay mode can serve it offline"""
+    path = fixture_path(endpoint, params, fixtures_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fixture = {
+        'endpoint': endpoint,
+        'params': normalize_params(params),
+        'frames': [json.loads(df.to_json(orient='split', index=False)) for df in frames]
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(fixture, f)
+    os.replace(tmp_path, path)
+
+def load_fixture(endpoint, params, fixtures_dir=None):
+    """Serve a recorded endpoint response, in the same shape as get_data_frames()"""
+    path = fixture_path(endpoint, params, fixtures_dir)
+    try:
+        with open(path) as f:
+            fixture = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"No fixture recorded for {endpoint} {normalize_params(params)} at {path}; "
+            f"run once with API_SETTINGS['mode'] = 'record' to capture it"
+        ) from None
+    # Keep the recorded types: no date parsing or dtype guessing on IDs
+    return [
+        pd.read_json(StringIO(json.dumps(frame)), orient='split', dtype=False, convert_dates=False)
+        for frame in fixture['frames']
+    ]
@@ -0,0 +1,159 @@
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+from nba_api.stats.static import teams
+
+from src.utils.constants import DATA_SETTINGS, SIMULATION_DEFAULTS
+
+# Local season store: one SQLite file per season holding game logs, rosters,
+# player bio and team stats, refreshed incrementally by sync.py
+
+def store_path(season):
+    return os.path.join(DATA_SETTINGS['season_store_dir'], f"wnba_{season}.sqlite")
+
+def connect(season):
+    os.makedirs(DATA_SETTINGS['season_store_dir'], exist_ok=True)
+    return closing(sqlite3.connect(store_path(season)))
+
+def table_exists(conn, table):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+def read_table(season, table, where='', params=()):
+    if not os.path.exists(store_path(season)):
+        return pd.DataFrame()
+    with connect(season) as conn:
+        if not table_exists(conn, table):
+            return pd.DataFrame()
+        return pd.read_sql_query(f"SELECT * FROM {table} {where}", conn, params=params)
+
+def last_game_date(season):
+    """Date of the most recent stored game, or None for an empty store"""
+    if not os.path.exists(store_path(season)):
+        return None
+    with connect(season) as conn:
+        if not table_exists(conn, 'gamelogs'):
+            return None
+        last = conn.execute("SELECT MAX(GAME_DATE) FROM gamelogs").fetchone()[0]
+    return pd.Timestamp(last) if last else None
+
+def write_gamelogs(season, gamelogs, since=None):
+    """Replace stored games on or after since with the freshly fetched ones"""
+    # A sync with no new games leaves the store as it is
+    if gamelogs.empty:
+        return
+    df = gamelogs.copy()
+    df['GAME_DATE'] = df['GAME_DATE'].dt.strftime('%Y-%m-%d')
+    with connect(season) as conn:
+        if since is not None and table_exists(conn, 'gamelogs'):
+            conn.execute("DELETE FROM gamelogs WHERE GAME_DATE >= ?", (since.strftime('%Y-%m-%d'),))
+        elif table_exists(conn, 'gamelogs'):
+            conn.execute("DROP TABLE gamelogs")
+        df.to_sql('gamelogs', conn, if_exists='append', index=False)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_gamelogs_player ON gamelogs (PLAYER_ID, GAME_DATE)")
+        conn.commit()
+
+def write_table(season, table, df):
+    with connect(season) as conn:
+        df.to_sql(table, conn, if_exists='replace', index=False)
+        conn.commit()
+
+def fetch_new_gamelogs(season, since=None):
+    from src.data.api_client import fetch_request, league_gamelog_request
+    from src.data.data_processor import normalize_gamelog
+
+    endpoint, params = league_gamelog_request(season)
+    if since is not None:
+        params['date_from_nullable'] = since.strftime('%m/%d/%Y')
+    return normalize_gamelog(fetch_request((endpoint, params), use_cache=False)[0])
+
+def fetch_rosters():
+    from src.data.api_client import fetch_request, roster_request, parse_height
+
+    rosters = []
+    for team in teams.get_wnba_teams():
+        try:
+            rosters.append(fetch_request(roster_request(team['id']), use_cache=False)[0])
+        except Exception as e:
+            print(f"Error fetching roster for {team['full_name']}: {e}")
+    if not rosters:
+        return pd.DataFrame()
+    roster_df = pd.concat(rosters, ignore_index=True)
+    roster_df['HEIGHT_IN'] = roster_df['HEIGHT'].map(parse_height)
+    return roster_df
+
+def fetch_team_stats():
+    from src.data.api_client import fetch_request, team_stats_request
+
+    stats = []
+    for team in teams.get_wnba_teams():
+        try:
+            df = fetch_request(team_stats_request(team['id']), use_cache=False)[0].copy()
+        except Exception as e:
+            print(f"Error fetching team stats vs {team['full_name']}: {e}")
+            continue
+        df['OPPONENT_TEAM_ID'] = team['id']
+        stats.append(df)
+    return pd.concat(stats, ignore_index=True) if stats else pd.DataFrame()
+
+def sync_season(season=None, full=False):
+    """Bring the store up to date, fetching only games since the last sync"""
+    from src.data.features import compute_rolling_features, write_features
+
+    season = season or SIMULATION_DEFAULTS['season']
+    since = None if full else last_game_date(season)
+
+    # Re-fetch the last stored date too, in case it was synced mid-slate
+    gamelogs = fetch_new_gamelogs(season, since)
+    write_gamelogs(season, gamelogs, since)
+    print(f"Synced {len(gamelogs)} game log rows" + (f" since {since.date()}" if since is not None else ""))
+
+    # Rolling features are recomputed over the whole stored season in one pass
+    stored = read_table(season, 'gamelogs')
+    if not stored.empty:
+        stored['GAME_DATE'] = pd.to_datetime(stored['GAME_DATE'])
+        features = compute_rolling_features(stored)
+        write_features(season, features)
+        print(f"Synced {len(features)} feature rows")
+
+    rosters = fetch_rosters()
+    if not rosters.empty:
+        write_table(season, 'rosters', rosters)
+        bio = rosters[['PLAYER_ID', 'PLAYER', 'TeamID', 'POSITION', 'HEIGHT', 'HEIGHT_IN']].rename(
+            columns={'TeamID': 'TEAM_ID', 'PLAYER': 'PLAYER_NAME'})
+        write_table(season, 'player_bio', bio)
+    print(f"Synced {len(rosters)} roster rows")
+
+    team_stats = fetch_team_stats()
+    if not team_stats.empty:
+        write_table(season, 'team_stats', team_stats)
+    print(f"Synced {len(team_stats)} team stat rows")
+
+    return last_game_date(season)
+
+def ensure_synced(season):
+    if last_game_date(season) is None:
+        print(f"Season store for {season} is empty, running a full sync...")
+        sync_season(season, full=True)
+
+def load_gamelogs(season=None):
+    season = season or SIMULATION_DEFAULTS['season']
+    ensure_synced(season)
+    return read_table(season, 'gamelogs')
+
+def load_roster(team_id, season=None):
+    season = season or SIMULATION_DEFAULTS['season']
+    ensure_synced(season)
+    return read_table(season, 'rosters', 'WHERE TeamID = ?', (int(team_id),))
+
+def load_player_bio(season=None):
+    season = season or SIMULATION_DEFAULTS['season']
+    ensure_synced(season)
+    return read_table(season, 'player_bio')
+
+def load_team_stats(opp_id, season=None):
+    season = season or SIMULATION_DEFAULTS['season']
+    ensure_synced(season)
+    return read_table(season, 'team_stats', 'WHERE OPPONENT_TEAM_ID = ?', (int(opp_id),))
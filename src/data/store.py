@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import Future
+
+# Run-scoped in-memory store shared by every helper in a simulation run
+
+class RunStore:
+    def __init__(self):
+        self._values = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the value for key, calling loader at most once per run.
+
+        Concurrent callers asking for a key that is already loading wait on
+        the first caller's result instead of loading it again.
+        """
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            future = self._pending.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._pending[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            # Failures are not stored, so a later call can retry the load
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._values[key] = value
+            del self._pending[key]
+        future.set_result(value)
+        return value
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._values
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+run_store = RunStore()
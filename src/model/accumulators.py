@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from src.model.monte_carlo import STATS, COMBOS
+
+# Mergeable summaries of simulated trials: batches are folded in as they are
+# drawn, so raw trials never need to be kept, and partial summaries from
+# different workers combine into the same result as one long run
+
+RESOLUTION = 10  # histogram bins per unit; every sampler outputs tenths or integers
+
+class Moments:
+    """Running count, mean and sum of squared deviations (Welford/Chan)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        other = Moments()
+        other.count = len(values)
+        if other.count:
+            other.mean = values.mean()
+            other.m2 = ((values - other.mean) ** 2).sum()
+        self.merge(other)
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        # Sample variance, matching pandas' std
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+class Histogram:
+    """Exact counts of values on a 1/RESOLUTION grid"""
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, values):
+        bins = np.rint(np.maximum(np.asarray(values, dtype=np.float64), 0) * RESOLUTION).astype(np.int64)
+        self.merge_counts(np.bincount(bins))
+
+    def merge_counts(self, counts):
+        if len(counts) > len(self.counts):
+            self.counts = np.pad(self.counts, (0, len(counts) - len(self.counts)))
+        self.counts[:len(counts)] += counts
+
+    def merge(self, other):
+        self.merge_counts(other.counts)
+        return self
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def value_at(self, rank):
+        """Value of the rank-th smallest trial (0-based)"""
+        return np.searchsorted(np.cumsum(self.counts), np.asarray(rank) + 1) / RESOLUTION
+
+    def quantile(self, q):
+        # Linear interpolation between order statistics, as np.quantile and pandas do
+        pos = (self.count - 1) * np.asarray(q, dtype=np.float64)
+        lo = np.floor(pos)
+        low, high = self.value_at(lo.astype(np.int64)), self.value_at(np.ceil(pos).astype(np.int64))
+        return low + (high - low) * (pos - lo)
+
+    def prob_over(self, line):
+        # Count in integer tenths: 2.3 * 10 is 22.999..., which a plain floor
+        # would turn into bin 22 and count trials equal to the line as overs.
+        # Rounding first keeps off-grid lines (20.25 -> 202.5) between bins.
+        first = int(np.floor(round(line * RESOLUTION, 6))) + 1
+        return self.counts[first:].sum() / self.count if self.count else np.nan
+
+    @property
+    def min(self):
+        return np.flatnonzero(self.counts)[0] / RESOLUTION
+
+    @property
+    def max(self):
+        return np.flatnonzero(self.counts)[-1] / RESOLUTION
+
+class StatSummary:
+    def __init__(self):
+        self.moments = Moments()
+        self.histogram = Histogram()
+
+    def update(self, values):
+        self.moments.update(values)
+        self.histogram.update(values)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+        return self
+
+    def describe(self, quantiles=(0.25, 0.5, 0.75, 0.9)):
+        row = {
+            'mean': self.moments.mean,
+            'std': self.moments.std,
+            'min': self.histogram.min,
+            'max': self.histogram.max
+        }
+        for q, value in zip(quantiles, self.histogram.quantile(quantiles)):
+            row[f"p{int(q * 100)}"] = value
+        return row
+
+class SimulationSummary:
+    """Per-stat (and combo) summaries of any number of (n, len(stats)) trial batches"""
+
+    def __init__(self, stats=STATS, combos=COMBOS):
+        self.stats = list(stats)
+        self.combos = {name: parts for name, parts in combos.items() if set(parts) <= set(self.stats)}
+        self.summaries = {name: StatSummary() for name in self.stats + list(self.combos)}
+
+    def update(self, values):
+        for i, stat in enumerate(self.stats):
+            self.summaries[stat].update(values[:, i])
+        for combo, parts in self.combos.items():
+            self.summaries[combo].update(sum(values[:, self.stats.index(part)] for part in parts))
+        return self
+
+    def merge(self, other):
+        for name, summary in other.summaries.items():
+            self.summaries[name].merge(summary)
+        return self
+
+    def __getitem__(self, stat):
+        return self.summaries[stat]
+
+    @property
+    def n_trials(self):
+        return self.summaries[self.stats[0]].moments.count
+
+    def mean(self, stat):
+        return self[stat].moments.mean
+
+    def std(self, stat):
+        return self[stat].moments.std
+
+    def quantile(self, stat, q):
+        return self[stat].histogram.quantile(q)
+
+    def prob_over(self, stat, line):
+        return self[stat].histogram.prob_over(line)
+
+    def to_frame(self, quantiles=(0.25, 0.5, 0.75, 0.9)):
+        """One row per stat: mean, std, min, max and percentiles"""
+        return pd.DataFrame({name: summary.describe(quantiles) for name, summary in self.summaries.items()}).T
+
+def merge_summaries(summaries):
+    merged = SimulationSummary()
+    for summary in summaries:
+        merged.merge(summary)
+    return merged
@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Defender assignment as a min-cost matching: one cost matrix per game over
+# position distance and impact difference, solved once for both teams
+
+POSITION_PRIORITY = {'G': 1, 'F': 2, 'C': 3}
+POSITION_WEIGHT = 10
+
+def linear_sum_assignment(cost):
+    """Hungarian algorithm (shortest augmenting paths with potentials), O(n^2 m).
+
+    Returns (row indices, column indices) of a minimum-cost matching that
+    covers every row or every column, whichever is smaller.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    # 1-based as in the textbook formulation; column 0 is a virtual start
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=np.int64)  # row matched to each column
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            free = ~used[1:]
+            reduced = cost[match[j0] - 1] - u[match[j0]] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            visited = np.flatnonzero(used)
+            u[match[visited]] += delta
+            v[visited] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(match[1:])
+    rows = match[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+def roster_profiles(player_ids):
+    """Name, position code and impact (PTS + 0.7 AST + 0.7 REB over recent games) per player"""
+    from src.data.api_client import get_player_name, get_position
+    from src.data.features import get_player_features
+
+    profiles = pd.DataFrame({'PLAYER_ID': list(player_ids)})
+    profiles['NAME'] = [get_player_name(pid) for pid in player_ids]
+    positions = [get_position(pid) or 'F' for pid in player_ids]
+    profiles['POS_CODE'] = [POSITION_PRIORITY.get(pos[0], 2) for pos in positions]
+    features = [get_player_features(pid) for pid in player_ids]
+    profiles['IMPACT'] = [f['IMPACT'] if f is not None else np.nan for f in features]
+    # Players without recent games cannot be matched, as before
+    return profiles.dropna(subset=['IMPACT']).reset_index(drop=True)
+
+def cost_matrix(home_profiles, opp_profiles):
+    """Home players x opponents: position distance * 10 + impact difference"""
+    pos_score = np.abs(home_profiles['POS_CODE'].to_numpy()[:, None] - opp_profiles['POS_CODE'].to_numpy()[None, :])
+    impact_diff = np.abs(home_profiles['IMPACT'].to_numpy()[:, None] - opp_profiles['IMPACT'].to_numpy()[None, :])
+    return pd.DataFrame(pos_score * POSITION_WEIGHT + impact_diff,
+                        index=home_profiles['NAME'], columns=opp_profiles['NAME'])
+
+def cover_all(costs, rows, cols):
+    """Both sides' index maps from a matching, with every player covered.
+
+    With unequal rosters the matching leaves players on the longer side
+    unmatched; each of them gets their cheapest opponent, so no player
+    (least of all a star the matching happened to skip) is left without one.
+    """
+    costs = np.asarray(costs, dtype=float)
+    team1 = dict(zip(rows.tolist(), cols.tolist()))
+    team2 = dict(zip(cols.tolist(), rows.tolist()))
+    for i in range(costs.shape[0]):
+        team1.setdefault(i, int(np.argmin(costs[i])))
+    for j in range(costs.shape[1]):
+        team2.setdefault(j, int(np.argmin(costs[:, j])))
+    return team1, team2
+
+def solve_matchups(team1_player_ids, team2_player_ids, date_str=None):
+    """Both teams' defender maps from one matching, cached per (rosters, date).
+
+    The cost is symmetric, so the optimal matching of team 1 against team 2 is
+    also team 2's optimal matching against team 1; players the matching leaves
+    out on the longer roster get their cheapest opponent. Returns
+    (team 1 map, team 2 map, cost matrix with team 1 as rows).
+    """
+    from src.data.store import run_store
+
+    date_str = date_str or datetime.today().strftime('%Y-%m-%d')
+    key = ('matchups', tuple(team1_player_ids), tuple(team2_player_ids), date_str)
+
+    def solve():
+        costs = cost_matrix(roster_profiles(team1_player_ids), roster_profiles(team2_player_ids))
+        rows, cols = linear_sum_assignment(costs.to_numpy())
+        team1, team2 = cover_all(costs.to_numpy(), rows, cols)
+        team1_map = {costs.index[i]: costs.columns[j] for i, j in team1.items()}
+        team2_map = {costs.columns[j]: costs.index[i] for j, i in team2.items()}
+        return team1_map, team2_map, costs
+
+    return run_store.get(key, solve)
@@ -0,0 +1,91 @@
+import numpy as np
+
+# Lineup-aware rebound and assist factors for any number of (player, lineup,
+# opposing lineup) rows in one pass. Lineups are 2-D arrays of player ids
+# padded with PAD; per-player heights, position codes and eFG come in as arrays
+# aligned with a sorted id array
+
+PAD = -1
+DEFAULT_HEIGHT = 72
+
+# Position codes are bit flags so hybrid positions ("Guard-Forward") keep both
+GUARD, FORWARD, CENTER = 1, 2, 4
+BIG = FORWARD | CENTER
+
+def position_code(position):
+    if not position:
+        return 0
+    return (GUARD if 'G' in position else 0) | (FORWARD if 'F' in position else 0) | (CENTER if 'C' in position else 0)
+
+def pad_lineups(lineups, width=None):
+    """List of id lists -> (rows, width) int array padded with PAD"""
+    width = width or max((len(lineup) for lineup in lineups), default=0)
+    out = np.full((len(lineups), width), PAD, dtype=np.int64)
+    for i, lineup in enumerate(lineups):
+        out[i, :len(lineup)] = list(lineup)[:width]
+    return out
+
+def lookup(ids, sorted_ids, values, fill):
+    """values for each id, and whether it was found (PAD and unknown ids get fill)"""
+    ids = np.asarray(ids)
+    if len(sorted_ids) == 0:
+        return np.full(ids.shape, fill), np.zeros(ids.shape, dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    found = (ids != PAD) & (sorted_ids[idx] == ids)
+    return np.where(found, values[idx], fill), found
+
+def masked_mean(values, mask, default):
+    counts = mask.sum(axis=1)
+    total = np.where(mask, values, 0).sum(axis=1)
+    return np.where(counts > 0, total / np.maximum(counts, 1), default), counts
+
+def rebound_factors(player_ids, lineups, opp_lineups, ids, heights, position_codes):
+    """Rebound factor per row: position bonus plus height edge over teammates and opponents.
+
+    player_ids is (n,), lineups (n, k) teammates and opp_lineups (n, m)
+    opponents; ids is sorted and aligned with heights and position_codes.
+    """
+    ids = np.asarray(ids)
+    heights = np.asarray(heights, dtype=float)
+    codes = np.asarray(position_codes, dtype=np.int64)
+
+    player_height, _ = lookup(player_ids, ids, heights, DEFAULT_HEIGHT)
+    player_code, _ = lookup(player_ids, ids, codes, 0)
+    mate_height, _ = lookup(lineups, ids, heights, DEFAULT_HEIGHT)
+    mate_code, _ = lookup(lineups, ids, codes, 0)
+    mates = np.asarray(lineups) != PAD
+    opp_height, _ = lookup(opp_lineups, ids, heights, DEFAULT_HEIGHT)
+    opps = np.asarray(opp_lineups) != PAD
+
+    avg_mate_height, n_mates = masked_mean(mate_height, mates, DEFAULT_HEIGHT)
+    avg_opp_height, _ = masked_mean(opp_height, opps, DEFAULT_HEIGHT)
+    bigs = (mates & ((mate_code & BIG) > 0)).sum(axis=1)
+
+    # Guards without a big alongside crash the glass; so do forwards next to a lone big
+    guard_bonus = ((player_code & GUARD) > 0) & (bigs == 0)
+    forward_bonus = ~guard_bonus & ((player_code & FORWARD) > 0) & (bigs == 1)
+    base = 1.0 + 0.2 * guard_bonus + 0.1 * forward_bonus
+
+    factor = base + (player_height - avg_mate_height) / 24 + (player_height - avg_opp_height) / 36
+    return np.where(n_mates > 0, np.clip(factor, 0.85, 1.2), 1.0)
+
+def assist_factors(lineups, ids, efg, league_efg):
+    """Assist factor per row: average eFG of the lineup's teammates over league eFG"""
+    mate_efg, found = lookup(lineups, np.asarray(ids), np.asarray(efg, dtype=float), np.nan)
+    valid = found & (mate_efg > 0)
+    avg_efg, counts = masked_mean(mate_efg, valid, league_efg)
+    return np.where(counts > 0, avg_efg / league_efg, 1.0)
+
+def player_arrays(player_ids, league_efg=None):
+    """Sorted ids with aligned heights, position codes and (given league_efg) eFG"""
+    from src.data.api_client import get_player_height_and_position
+    from src.model.graph import projection_graph
+
+    ids = np.array(sorted(set(int(pid) for pid in player_ids if pid != PAD)), dtype=np.int64)
+    bio = [get_player_height_and_position(int(pid)) for pid in ids]
+    heights = np.array([height for height, _ in bio], dtype=float)
+    codes = np.array([position_code(position) for _, position in bio], dtype=np.int64)
+    efg = None
+    if league_efg is not None:
+        efg = np.array([projection_graph.get('efg', int(pid), league_efg) for pid in ids], dtype=float)
+    return ids, heights, codes, efg
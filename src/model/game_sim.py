@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+from src.model.monte_carlo import SimulationResult, STATS, stream_seed
+from src.utils.constants import SIMULATION_DEFAULTS
+
+# Possession-level game engine: both teams share one pace draw per trial and
+# every player's stats are carved out of their team's possessions, misses and makes
+
+BENCH_ID = 0  # pseudo-player holding the rest of each roster
+
+LEAGUE_RATES = {
+    'fg2_pct': 0.48,
+    'fg3_pct': 0.33,
+    'fg3a_rate': 0.3,
+    'ft_pct': 0.78,
+    'oreb_rate': 0.28,
+    'ast_rate': 0.65
+}
+
+def ratio(num, den, default):
+    return np.where(den > 0, num / np.where(den > 0, den, 1), default)
+
+def player_rates(recent_means):
+    """Possession mix and shooting rates from per-game means (one row per player)"""
+    m = recent_means
+    usage_poss = m['FGA'] + 0.44 * m['FTA'] + m['TOV']
+    rates = pd.DataFrame(index=m.index)
+    rates['MIN'] = m['MIN']
+    rates['usage_poss'] = usage_poss
+    rates['fga_frac'] = ratio(m['FGA'], usage_poss, 0.8)
+    rates['trip_frac'] = ratio(0.44 * m['FTA'], usage_poss, 0.1)
+    rates['tov_frac'] = ratio(m['TOV'], usage_poss, 0.1)
+    rates['fg3a_rate'] = ratio(m['FG3A'], m['FGA'], LEAGUE_RATES['fg3a_rate'])
+    rates['fg2_pct'] = ratio(m['FGM'] - m['FG3M'], m['FGA'] - m['FG3A'], LEAGUE_RATES['fg2_pct'])
+    rates['fg3_pct'] = ratio(m['FG3M'], m['FG3A'], LEAGUE_RATES['fg3_pct'])
+    rates['ft_pct'] = ratio(m['FTM'], m['FTA'], LEAGUE_RATES['ft_pct'])
+    rates['reb_weight'] = m['REB']
+    rates['ast_weight'] = m['AST']
+    return rates
+
+def build_team_table(team_id, roster_ids, rotation_size, recent_games=10, include_ids=()):
+    """Rotation players (plus any include_ids) and one bench row for the rest of the roster"""
+    from src.data.api_client import get_player_gamelog
+
+    logs = [get_player_gamelog(pid).assign(PLAYER_ID=pid) for pid in roster_ids]
+    logs = [log for log in logs if not log.empty]
+    if not logs:
+        raise ValueError(f"No game logs for team {team_id}")
+    season_logs = pd.concat(logs, ignore_index=True)
+
+    cols = ['MIN', 'FGA', 'FGM', 'FG3A', 'FG3M', 'FTA', 'FTM', 'TOV', 'REB', 'AST', 'OREB']
+    recent = season_logs.groupby('PLAYER_ID', sort=False).head(recent_games)
+    means = recent.groupby('PLAYER_ID')[cols].mean()
+    means = means.sort_values('MIN', ascending=False)
+
+    rotation_ids = list(means.index[:rotation_size])
+    rotation_ids += [pid for pid in include_ids if pid in means.index and pid not in rotation_ids]
+    rotation = means.loc[rotation_ids]
+    table = rotation
+
+    # Bench players don't all play the same games, so their row is the per-game
+    # bench total over the team's recent games, not a sum of per-player means
+    bench_ids = [pid for pid in means.index if pid not in rotation_ids]
+    if bench_ids:
+        team_dates = season_logs['GAME_DATE'].drop_duplicates().nlargest(recent_games)
+        bench_logs = season_logs[season_logs['PLAYER_ID'].isin(bench_ids) & season_logs['GAME_DATE'].isin(team_dates)]
+        bench_row = (bench_logs[cols].sum() / len(team_dates)).to_frame(BENCH_ID).T
+        table = pd.concat([rotation, bench_row])
+
+    rates = player_rates(table)
+    rates['TEAM_ID'] = team_id
+    rates.index.name = 'PLAYER_ID'
+
+    totals = table.sum()
+    team_rates = {
+        'oreb_rate': float(ratio(totals['OREB'], totals['FGA'] - totals['FGM'], LEAGUE_RATES['oreb_rate'])),
+        'ast_rate': float(ratio(totals['AST'], totals['FGM'], LEAGUE_RATES['ast_rate']))
+    }
+    return rates, team_rates
+
+def apply_projection(rates, player_id, player_sim_data, team_possessions):
+    """Fold a target player's matchup-adjusted projection into their table row"""
+    if player_id not in rates.index:
+        return
+    row = rates.loc[player_id]
+    raw_efg = (row['fg2_pct'] * (1 - row['fg3a_rate']) + 1.5 * row['fg3_pct'] * row['fg3a_rate'])
+    if raw_efg > 0:
+        scale = player_sim_data['adj_efg'] / raw_efg
+        rates.loc[player_id, 'fg2_pct'] = min(row['fg2_pct'] * scale, 0.95)
+        rates.loc[player_id, 'fg3_pct'] = min(row['fg3_pct'] * scale, 0.95)
+    rates.loc[player_id, 'usage_poss'] = player_sim_data['usage_rate'] * team_possessions
+    rates.loc[player_id, 'reb_weight'] = player_sim_data['adj_rolling_stats']['REB']
+    rates.loc[player_id, 'ast_weight'] = player_sim_data['adj_rolling_stats']['AST']
+
+def shares(weights):
+    weights = np.clip(np.asarray(weights, dtype=float), 0, None)
+    total = weights.sum()
+    return weights / total if total > 0 else np.full(len(weights), 1 / len(weights))
+
+def simulate_team_offense(rng, possessions, rates):
+    """Split each trial's possessions across players and resolve them into shots"""
+    usage = rng.multinomial(possessions, shares(rates['usage_poss']))  # trials x players
+    mix = np.column_stack([rates['fga_frac'], rates['trip_frac'], rates['tov_frac']])
+    outcomes = rng.multinomial(usage, mix / mix.sum(axis=1, keepdims=True))  # trials x players x 3
+    fga, trips = outcomes[..., 0], outcomes[..., 1]
+
+    fg3a = rng.binomial(fga, rates['fg3a_rate'].to_numpy())
+    fg3m = rng.binomial(fg3a, rates['fg3_pct'].to_numpy())
+    fg2m = rng.binomial(fga - fg3a, rates['fg2_pct'].to_numpy())
+    # 0.44 FTA per trip: two shots, plus the occasional and-one or three-shot foul
+    fta = 2 * trips + rng.binomial(trips, 0.27)
+    ftm = rng.binomial(fta, rates['ft_pct'].to_numpy())
+
+    return {
+        'PTS': 2 * fg2m + 3 * fg3m + ftm,
+        'FGM': fg2m + fg3m,
+        'MISSES': (fga - fg2m - fg3m).sum(axis=1)
+    }
+
+def allocate(rng, totals, weights):
+    return rng.multinomial(totals, shares(weights))
+
+def simulate_game(tables, team_rates, team_possessions, n_simulations, rng=None, pace_std=None):
+    """Simulate every player of both teams for all trials at once.
+
+    Returns {player_id: SimulationResult} for every rotation player.
+    """
+    rng = rng if rng is not None else np.random.default_rng(stream_seed(*sorted(tables)))
+    pace_std = pace_std or SIMULATION_DEFAULTS['pace_std'] * team_possessions
+    team_ids = list(tables)
+
+    # One shared pace per trial keeps both teams' possession counts consistent
+    pace = rng.normal(team_possessions, pace_std, size=n_simulations)
+    possessions = np.maximum(np.rint(pace), 1).astype(np.int64)
+
+    offense = {tid: simulate_team_offense(rng, possessions, tables[tid]) for tid in team_ids}
+
+    # Every miss is rebounded by one of the two teams: each team's OREB is drawn
+    # once and the opponent's DREB is the rest of those misses
+    oreb = {tid: rng.binomial(offense[tid]['MISSES'], team_rates[tid]['oreb_rate']) for tid in team_ids}
+
+    results = {}
+    team_reb = 0
+    for tid in team_ids:
+        opp = team_ids[1] if tid == team_ids[0] else team_ids[0]
+        rates = tables[tid]
+
+        dreb = offense[opp]['MISSES'] - oreb[opp]
+        reb = allocate(rng, oreb[tid] + dreb, rates['reb_weight'])
+        team_reb = team_reb + reb.sum(axis=1)
+
+        assisted = rng.binomial(offense[tid]['FGM'].sum(axis=1), min(team_rates[tid]['ast_rate'], 1.0))
+        ast = allocate(rng, assisted, rates['ast_weight'])
+
+        for i, pid in enumerate(rates.index):
+            if pid == BENCH_ID:
+                continue
+            values = np.column_stack([offense[tid]['PTS'][:, i], reb[:, i], ast[:, i]]).astype(np.float32)
+            results[pid] = SimulationResult(values, STATS)
+
+    misses = sum(offense[tid]['MISSES'] for tid in team_ids)
+    if not np.array_equal(team_reb, misses):
+        raise ValueError("Team rebounds do not add up to missed shots")
+    return results
+
+def run_game_sim(context, projections, n_simulations, rng=None):
+    """Build both teams' tables from the game context and simulate them together.
+
+    projections maps target player ids to their get_primary_defender_matchup output.
+    """
+    tables = {}
+    team_rates = {}
+    for team_id, roster_ids in context.rosters.items():
+        rates, team_rate = build_team_table(team_id, roster_ids, SIMULATION_DEFAULTS['rotation_size'],
+                                            SIMULATION_DEFAULTS['recent_games'], include_ids=list(projections))
+        for pid, player_sim_data in projections.items():
+            apply_projection(rates, pid, player_sim_data, context.team_possessions)
+        tables[team_id] = rates
+        team_rates[team_id] = team_rate
+    return simulate_game(tables, team_rates, context.team_possessions, n_simulations, rng)
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pandas as pd
+
+# Projection graph: every intermediate of a player projection is a named node,
+# evaluated on first use and memoized in the run store, so teammates, eFG,
+# usage and factors are shared by every target player (and game) in a run
+
+class ProjectionGraph:
+    def __init__(self):
+        self.nodes = {}
+        self.edges = set()
+        self.stats = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def node(self, name):
+        """Register fn(*key) as the node called name"""
+        def register(fn):
+            self.nodes[name] = fn
+            return fn
+        return register
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, name, hit=False, elapsed=0.0, self_time=0.0):
+        with self._lock:
+            stats = self.stats.setdefault(name, {'evaluations': 0, 'hits': 0, 'total_s': 0.0, 'self_s': 0.0})
+            if hit:
+                stats['hits'] += 1
+            else:
+                stats['evaluations'] += 1
+                stats['total_s'] += elapsed
+                stats['self_s'] += self_time
+
+    def get(self, name, *key):
+        """Value of node name for key, evaluating it (and its dependencies) at most once per run"""
+        from src.data.store import run_store
+
+        stack = self._stack()
+        if stack:
+            with self._lock:
+                self.edges.add((stack[-1][0], name))
+
+        def evaluate():
+            stack.append([name, 0.0])
+            start = time.perf_counter()
+            try:
+                return self.nodes[name](*key)
+            finally:
+                elapsed = time.perf_counter() - start
+                _, child_time = stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                self._record(name, elapsed=elapsed, self_time=elapsed - child_time)
+
+        store_key = ('graph', name) + key
+        if store_key in run_store:
+            self._record(name, hit=True)
+        return run_store.get(store_key, evaluate)
+
+    def reset(self):
+        """Forget timings and edges; values live in the run store and clear with it"""
+        with self._lock:
+            self.edges.clear()
+            self.stats.clear()
+
+    def report(self):
+        """Per-node evaluations, cache hits and inclusive/self time"""
+        df = pd.DataFrame.from_dict(self.stats, orient='index')
+        if df.empty:
+            return df
+        df.index.name = 'node'
+        return df.sort_values('total_s', ascending=False)
+
+    def dump(self):
+        print("\nPROJECTION GRAPH")
+        for name in sorted(self.nodes):
+            deps = sorted(child for parent, child in self.edges if parent == name)
+            print(f"  {name} -> {', '.join(deps) if deps else '(leaf)'}")
+        report = self.report()
+        if not report.empty:
+            print(report.round(4).to_string())
+
+projection_graph = ProjectionGraph()
+
+# Nodes. Keys are plain ids (plus the game context where a node is per game)
+
+@projection_graph.node('features')
+def features_node(player_id):
+    from src.data.features import get_player_features
+    return get_player_features(player_id)
+
+@projection_graph.node('teammates')
+def teammates_node(player_id):
+    from src.model.usage_calculator import player_teammates
+    return tuple(player_teammates(player_id))
+
+@projection_graph.node('roster_teammates')
+def roster_teammates_node(roster_ids):
+    from src.model.usage_calculator import compute_roster_teammates
+    return compute_roster_teammates(roster_ids)
+
+@projection_graph.node('possessions')
+def possessions_node(home_id, opp_id):
+    from src.data.api_client import calculate_team_possessions
+    return calculate_team_possessions(home_id, opp_id)
+
+@projection_graph.node('defender')
+def defender_node(context, team_id, player_id):
+    from src.model.matchup_analyzer import find_defender_id
+    return find_defender_id(context, team_id, player_id)
+
+@projection_graph.node('efg')
+def efg_node(player_id, league_efg):
+    from src.model.matchup_analyzer import calculate_eFG
+    return calculate_eFG(player_id, league_efg)
+
+@projection_graph.node('ast_factor')
+def ast_factor_node(player_id, league_efg):
+    from src.model.matchup_analyzer import calculate_ast_factor
+    return calculate_ast_factor(player_id, league_efg)
+
+@projection_graph.node('reb_factor')
+def reb_factor_node(player_id, defender_id):
+    from src.model.matchup_analyzer import get_reb_factor
+    return get_reb_factor(player_id, projection_graph.get('teammates', defender_id))
+
+@projection_graph.node('usage_table')
+def usage_table_node(team_id, roster_ids, team_possessions):
+    from src.model.usage_calculator import compute_usage_table
+    return compute_usage_table(roster_ids, team_possessions)
+
+@projection_graph.node('segment_minutes')
+def segment_minutes_node(player_id):
+    from src.model.matchup_analyzer import calculate_segment_mins
+    return calculate_segment_mins(player_id)
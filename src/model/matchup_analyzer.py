@@ -1,301 +1,133 @@
+import numpy as np
 import pandas as pd
-import time
-from nba_api.stats.endpoints import playergamelog, commonplayerinfo
-from nba_api.stats.static import players
-
-def get_position(p_id):
-    try:
-        df = commonplayerinfo.CommonPlayerInfo(
-            player_id=p_id,
-            league_id_nullable='10'  # WNBA
-        ).get_data_frames()[0]
-        time.sleep(1)
-        return df['POSITION'].iloc[0]
-    except:
-        return None
-
-def get_impact_scores(player_dict):
-    impact_list = []
-    season='2025'
-    n_games=10
-    for p_id, info in player_dict.items():
-        try:
-            gamelog = playergamelog.PlayerGameLog(
-                player_id=p_id,
-                season=season,
-                season_type_all_star='Regular Season',
-                league_id_nullable='10'
-            ).get_data_frames()[0]
-            recent_games = gamelog.head(n_games)
-            mean_pts = recent_games['PTS'].mean()
-            mean_ast = recent_games['AST'].mean()
-            mean_reb = recent_games['REB'].mean()
-            impact_score = mean_pts + 0.7 * mean_ast + 0.7 * mean_reb
-            impact_list.append({
-                'id': p_id,
-                'name': info['name'],
-                'position': info['position'],
-                'impact': impact_score
-            })
-            time.sleep(1)
-        except Exception as e:
-            print(f"Failed to get impact for {info['name']}: {e}")
-            continue
-    return sorted(impact_list, key=lambda x: x['impact'], reverse=True)
+from src.data.features import stat_corr
+from src.model.graph import projection_graph
 
 def calculate_segment_mins(id):
-    try:
-        gamelog_df = playergamelog.PlayerGameLog(
-            player_id=id,
-            season='2025',
-            season_type_all_star='Regular Season',
-            league_id_nullable='10'
-        ).get_data_frames()[0][['MIN']]
-        rolling_average_mins = gamelog_df[['MIN']].mean()
-        segment_mins = rolling_average_mins * (10 / 40) 
-        return float(segment_mins.iloc[0])
-    except:
+    features = projection_graph.get('features', id)
+    if features is None:
         return 8.0  # default minutes
+    return float(features['SEGMENT_MIN'])
 
-def create_matchup_assignments(home_team_player_ids, opp_team_player_ids):
-    """Create basic matchup assignments based on positions and impact"""
-    from src.data.api_client import get_player_name
-    
-    # Get player info for both teams
-    home_positions = {}
-    opp_positions = {}
-    
-    for id in home_team_player_ids:
-        home_positions[id] = {
-            'name': get_player_name(id),
-            'position': get_position(id)
-        }
-    
-    for id in opp_team_player_ids:
-        opp_positions[id] = {
-            'name': get_player_name(id),
-            'position': get_position(id)
-        }
-    
-    # Get impact scores
-    home_sorted = get_impact_scores(home_positions)
-    opp_sorted = get_impact_scores(opp_positions)
-    
-    # Create matchup dictionary (simplified logic)
-    matchup_dict = {}
-    used_defenders = set()
-    
-    # Match by position priority and impact
-    position_priority = {'G': 1, 'F': 2, 'C': 3}
-    
-    for home_player in home_sorted:
-        best_defender = None
-        best_score = float('inf')
-        
-        home_pos = home_player['position'] or 'F'
-        home_pos_norm = home_pos[0] if home_pos else 'F'
-        
-        for opp_player in opp_sorted:
-            if opp_player['name'] in used_defenders:
-                continue
-                
-            opp_pos = opp_player['position'] or 'F'
-            opp_pos_norm = opp_pos[0] if opp_pos else 'F'
-            
-            # Position matching score (lower is better)
-            pos_score = abs(position_priority.get(home_pos_norm, 2) - 
-                           position_priority.get(opp_pos_norm, 2))
-            
-            # Impact difference (prefer similar impact levels)
-            impact_diff = abs(home_player['impact'] - opp_player['impact'])
-            
-            total_score = pos_score * 10 + impact_diff
-            
-            if total_score < best_score:
-                best_score = total_score
-                best_defender = opp_player['name']
-        
-        if best_defender:
-            matchup_dict[home_player['name']] = best_defender
-            used_defenders.add(best_defender)
-    
-    return matchup_dict
+def create_matchup_assignments(home_team_player_ids, opp_team_player_ids, date_str=None):
+    """Defender for each home player from the game's min-cost position/impact matching"""
+    from src.model.assignment import solve_matchups
+
+    home_map, _, _ = solve_matchups(home_team_player_ids, opp_team_player_ids, date_str)
+    return home_map
+
+def find_defender_id(context, team_id, player_id):
+    from src.data.api_client import get_player_name, find_player_id
 
-def get_primary_defender_matchup(home_team_player_ids, opp_team_player_ids, player_id):
-    from src.data.api_client import (get_player_name, get_player_height_and_position, 
-                                   get_team_id_from_player_id, calculate_team_possessions,
-                                   player_id_to_name)
-    from src.data.data_processor import on_court_teammates
-    from src.model.usage_calculator import calculate_usage_rate
-    
-    # Create matchup assignments
-    matchup_dict = create_matchup_assignments(home_team_player_ids, opp_team_player_ids)
-    
-    # Get basic info
     player_name = get_player_name(player_id)
-    home_team_id = get_team_id_from_player_id(player_id)
-    
-    # Find opponent team ID
-    opp_team_id = None
-    for opp_id in opp_team_player_ids:
-        try:
-            opp_team_id = get_team_id_from_player_id(opp_id)
-            break
-        except:
-            continue
-    
-    if not opp_team_id:
-        raise ValueError("Could not determine opponent team ID")
-    
-    # Get defender ID
-    defender_name = matchup_dict.get(player_name)
+    defender_name = context.defender_name(team_id, player_name)
     if not defender_name:
         raise ValueError(f"No matchup found for {player_name}")
     
-    defender_data = players.find_wnba_players_by_full_name(defender_name)
-    if not defender_data:
+    defender_id = find_player_id(defender_name)
+    if defender_id is None:
         raise ValueError(f"Could not find defender: {defender_name}")
-    
-    defender_id = defender_data[0]['id']
-    
-    # Calculate league average eFG% (simplified)
-    LEAGUE_EFG = 0.52  # approximate WNBA average
-    
-    def calculate_eFG(pid):
-        try:
-            gamelog = playergamelog.PlayerGameLog(
-                player_id=pid,
-                season='2025',
-                season_type_all_star='Regular Season',
-                league_id_nullable='10'
-            ).get_data_frames()[0]
-            recent_games = gamelog.head(10)
-            
-            fgm = recent_games['FGM'].mean()
-            fg3m = recent_games['FG3M'].mean()
-            fga = recent_games['FGA'].mean()
-            
-            if fga == 0:
-                return LEAGUE_EFG
-            
-            efg = (fgm + 0.5 * fg3m) / fga
-            time.sleep(1)
-            return efg
-        except:
-            return LEAGUE_EFG
-    
-    def calculate_ast_factor(pid):
-        try:
-            co_player_ids = on_court_teammates(pid)
-            if not co_player_ids:
-                return 1.0
-                
-            total_teammate_eFG = 0
-            valid_teammates = 0
-            for p_id in co_player_ids:
-                efg = calculate_eFG(p_id)
-                if efg > 0:
-                    total_teammate_eFG += efg
-                    valid_teammates += 1
-            
-            if valid_teammates == 0:
-                return 1.0
-                
-            teammate_eFG = total_teammate_eFG / valid_teammates
-            return teammate_eFG / LEAGUE_EFG
-        except:
-            return 1.0
-    
-    def get_reb_factor(pid, opp_on_court_ids):
-        try:
-            player_height, player_pos = get_player_height_and_position(pid)
-            
-            teammates = on_court_teammates(pid)
-            if not teammates:
-                return 1.0
-                
-            teammate_heights = []
-            teammate_positions = []
-
-            for teammate_id in teammates:
-                h, pos = get_player_height_and_position(teammate_id)
-                teammate_heights.append(h)
-                teammate_positions.append(pos)
+    return defender_id
 
-            avg_teammate_height = sum(teammate_heights) / len(teammate_heights)
-            player_vs_teammates = player_height - avg_teammate_height
+def calculate_eFG(pid, league_efg):
+    try:
+        features = projection_graph.get('features', pid)
+        if features is None or pd.isna(features['EFG']):
+            return league_efg
+        return features['EFG']
+    except:
+        return league_efg
 
-            has_big = any(p and ('F' in p or 'C' in p) for p in teammate_positions)
-            only_one_big = sum(1 for p in teammate_positions if p and ('F' in p or 'C' in p)) == 1
+def calculate_ast_factor(pid, league_efg):
+    from src.model.factors import assist_factors, pad_lineups, player_arrays
 
-            opp_heights = []
-            for pid in opp_on_court_ids:
-                h, _ = get_player_height_and_position(pid)
-                opp_heights.append(h)
+    try:
+        co_player_ids = projection_graph.get('teammates', pid)
+        if not co_player_ids:
+            return 1.0
+        ids, _, _, efg = player_arrays(co_player_ids, league_efg)
+        return float(assist_factors(pad_lineups([co_player_ids]), ids, efg, league_efg)[0])
+    except:
+        return 1.0
 
-            avg_opp_height = sum(opp_heights) / len(opp_heights) if opp_heights else 72
-            height_diff_vs_opp = player_height - avg_opp_height
+def get_reb_factor(pid, opp_on_court_ids):
+    from src.model.factors import rebound_factors, pad_lineups, player_arrays
 
-            base_factor = 1.0
+    try:
+        teammates = projection_graph.get('teammates', pid)
+        if not teammates:
+            return 1.0
+        ids, heights, codes, _ = player_arrays((pid,) + tuple(teammates) + tuple(opp_on_court_ids))
+        factors = rebound_factors(np.array([pid]), pad_lineups([teammates]), pad_lineups([opp_on_court_ids]),
+                                  ids, heights, codes)
+        return float(factors[0])
+    except:
+        return 1.0
 
-            if player_pos and 'G' in player_pos and not has_big:
-                base_factor += 0.2
-            elif player_pos and 'F' in player_pos and only_one_big:
-                base_factor += 0.1
+def get_primary_defender_matchup(home_team_player_ids, opp_team_player_ids, player_id, context=None):
+    from src.data.api_client import get_team_id_from_player_id
+    from src.model.matchup_context import build_matchup_context
+    from src.model.usage_calculator import get_game_usage_tables, lookup_usage_rate
+    
+    if context is None:
+        # Standalone call: build this game's context from the rosters
+        home_team_id = get_team_id_from_player_id(player_id)
+        opp_team_id = None
+        for opp_id in opp_team_player_ids:
+            try:
+                opp_team_id = get_team_id_from_player_id(opp_id)
+                break
+            except:
+                continue
 
-            height_adj = player_vs_teammates / 24
-            opp_adj = height_diff_vs_opp / 36
+        if not opp_team_id:
+            raise ValueError("Could not determine opponent team ID")
 
-            reb_factor = base_factor + height_adj + opp_adj
-            return max(0.85, min(reb_factor, 1.2))
-        except:
-            return 1.0
+        context = build_matchup_context(home_team_player_ids, opp_team_player_ids, home_team_id, opp_team_id)
+    else:
+        home_team_id = context.team_id_for(player_id) or get_team_id_from_player_id(player_id)
+        opp_team_id = context.opponent_id(home_team_id)
+    
+    # Get defender ID
+    defender_id = projection_graph.get('defender', context, home_team_id, player_id)
+    
+    LEAGUE_EFG = context.league_efg
     
     # Calculate adjusted stats
     try:
         # Get player stats
-        gamelog = playergamelog.PlayerGameLog(
-            player_id=player_id,
-            season='2025',
-            season_type_all_star='Regular Season',
-            league_id_nullable='10'
-        ).get_data_frames()[0]
-        recent_games = gamelog.head(10)
+        features = projection_graph.get('features', player_id)
         
-        if recent_games.empty:
+        if features is None:
             raise ValueError(f"No recent games found for player {player_id}")
         
-        # Calculate base stats
-        if recent_games['FTA'].sum() != 0:
-            ft_pct = recent_games['FTM'].sum() / recent_games['FTA'].sum()
-        else:
-            ft_pct = 0.8
-            
-        fta_per_min = recent_games['FTA'].sum() / recent_games['MIN'].sum() if recent_games['MIN'].sum() > 0 else 0
+        # Base stats come precomputed from the feature store
+        ft_pct = features['FT_PCT']
+        fta_per_min = features['FTA_PER_MIN']
         
-        rolling_ast = recent_games['AST'].mean()
-        rolling_reb = recent_games['REB'].mean()
+        rolling_ast = features['AST_MEAN']
+        rolling_reb = features['REB_MEAN']
         
-        reb_std = recent_games['REB'].std()
-        ast_std = recent_games['AST'].std()
-        pts_std = recent_games['PTS'].std()
+        reb_std = features['REB_STD']
+        ast_std = features['AST_STD']
+        pts_std = features['PTS_STD']
         
-        # Calculate factors
-        player_efg = calculate_eFG(player_id)
-        defender_efg = calculate_eFG(defender_id)
+        # Calculate factors (graph nodes, shared with every other projection in the run)
+        player_efg = projection_graph.get('efg', player_id, LEAGUE_EFG)
+        defender_efg = projection_graph.get('efg', defender_id, LEAGUE_EFG)
         adj_efg = player_efg * (LEAGUE_EFG / max(defender_efg, 0.3))  # Prevent division by very small numbers
         
-        teammate_AST_factor = calculate_ast_factor(player_id)
-        opp_AST_factor = calculate_ast_factor(defender_id)
+        teammate_AST_factor = projection_graph.get('ast_factor', player_id, LEAGUE_EFG)
+        opp_AST_factor = projection_graph.get('ast_factor', defender_id, LEAGUE_EFG)
         
-        opp_on_court_ids = on_court_teammates(defender_id)
-        reb_factor = get_reb_factor(player_id, opp_on_court_ids)
+        reb_factor = projection_graph.get('reb_factor', player_id, defender_id)
         
-        segment_minutes = calculate_segment_mins(player_id)
-        usage_rate = calculate_usage_rate(player_id, home_team_id, opp_team_id)
+        segment_minutes = projection_graph.get('segment_minutes', player_id)
+        # Both rosters' usage is computed in one batch per game; this just indexes it
+        usage_rate = lookup_usage_rate(get_game_usage_tables(context)[home_team_id], player_id)
         
         # Calculate team possessions and estimates
-        team_possessions_per_game = calculate_team_possessions(home_team_id, opp_team_id)
+        team_possessions_per_game = context.team_possessions
         segment_possessions = team_possessions_per_game * (segment_minutes / 40)
         
         est_fga = segment_possessions * usage_rate * 4  # per game
@@ -324,7 +156,11 @@ def get_primary_defender_matchup(home_team_player_ids, opp_team_player_ids, play
                 'PTS': pts_std if pd.notna(pts_std) else 3.0,
                 'REB': reb_std if pd.notna(reb_std) else 1.5,
                 'AST': ast_std if pd.notna(ast_std) else 1.0
-            }
+            },
+            'zero_rate': {
+                stat: float(features[f'{stat}_ZERO_RATE']) for stat in ['PTS', 'REB', 'AST']
+            },
+            'stat_corr': stat_corr(features)
         }
         
     except Exception as e:
@@ -0,0 +1,46 @@
+from src.utils.constants import ROLLINGLEAGUE_EFG
+
+# Per-game context computed once and shared by every player's projection
+
+class MatchupContext:
+    def __init__(self, team1_player_ids, team2_player_ids, team1_id, team2_id,
+                 team_possessions, matchups, league_efg=ROLLINGLEAGUE_EFG, cost_matrix=None, date_str=None):
+        self.rosters = {team1_id: list(team1_player_ids), team2_id: list(team2_player_ids)}
+        self.opponents = {team1_id: team2_id, team2_id: team1_id}
+        self.team_possessions = team_possessions
+        self.matchups = matchups  # team id -> {player name: defender name}
+        self.league_efg = league_efg
+        self.cost_matrix = cost_matrix  # team 1 names x team 2 names, for inspection
+        self.date_str = date_str  # slate date, YYYY-MM-DD (None for today)
+
+    def team_id_for(self, player_id):
+        """Which side of this game a player is on, or None"""
+        for team_id, roster in self.rosters.items():
+            if player_id in roster:
+                return team_id
+        return None
+
+    def opponent_id(self, team_id):
+        return self.opponents[team_id]
+
+    def roster(self, team_id):
+        return self.rosters[team_id]
+
+    def defender_name(self, team_id, player_name):
+        return self.matchups[team_id].get(player_name)
+
+def build_matchup_context(team1_player_ids, team2_player_ids, team1_id, team2_id, date_str=None):
+    """Fetch possessions and build both teams' defender assignments for one game on date_str"""
+    from src.model.assignment import solve_matchups
+    from src.model.graph import projection_graph
+
+    # The possession estimate averages both teams, so it is the same from either side
+    team_possessions = projection_graph.get('possessions', team1_id, team2_id)
+    # One matching gives both teams' defender maps
+    team1_map, team2_map, cost_matrix = solve_matchups(team1_player_ids, team2_player_ids, date_str)
+    matchups = {
+        team1_id: team1_map,
+        team2_id: team2_map
+    }
+    return MatchupContext(team1_player_ids, team2_player_ids, team1_id, team2_id,
+                          team_possessions, matchups, cost_matrix=cost_matrix, date_str=date_str)
@@ -1,28 +1,330 @@
 import numpy as np
 import pandas as pd
 
+from src.utils.constants import SIMULATION_DEFAULTS
+
 # Simulation engine
 
-def run_monte_carlo_sim(player_sim_data, n_simulations):
+STATS = ['PTS', 'REB', 'AST']
+
+# Distribution registry: each sampler draws `size` values for one stat from its
+# adjusted mean, rolling std and share of zero games
+
+def sample_normal(rng, mean, std, size, zero_rate=0.0):
+    values = rng.normal(loc=mean, scale=std, size=size)
+    # Clamp to 0, round to 1 decimal
+    np.maximum(values, 0, out=values)
+    np.round(values, 1, out=values)
+    return values
+
+def sample_poisson(rng, mean, std, size, zero_rate=0.0):
+    return rng.poisson(max(mean, 0.0), size=size)
+
+def negative_binomial_params(mean, var):
+    """Method-of-moments (n, p), or None when the data is not overdispersed"""
+    if mean <= 0 or var <= mean:
+        return None
+    n = mean ** 2 / (var - mean)
+    return n, n / (n + mean)
+
+def sample_negative_binomial(rng, mean, std, size, zero_rate=0.0):
+    params = negative_binomial_params(mean, std ** 2)
+    if params is None:
+        return sample_poisson(rng, mean, std, size)
+    return rng.negative_binomial(params[0], params[1], size=size)
+
+def zero_inflated_count_moments(mean, std, zero_rate):
+    # Structural zeros with probability zero_rate, otherwise a count whose
+    # moments are rescaled so the mixture keeps the player's mean and std
+    count_mean = mean / (1 - zero_rate)
+    count_var = (std ** 2 + mean ** 2) / (1 - zero_rate) - count_mean ** 2
+    return count_mean, np.sqrt(max(count_var, 0.0))
+
+def sample_zero_inflated(rng, mean, std, size, zero_rate=0.0):
+    zero_rate = min(max(zero_rate, 0.0), 0.95)
+    if mean <= 0 or zero_rate == 0:
+        return sample_negative_binomial(rng, mean, std, size)
+    count_mean, count_std = zero_inflated_count_moments(mean, std, zero_rate)
+    values = sample_negative_binomial(rng, count_mean, count_std, size)
+    values[rng.random(size) < zero_rate] = 0
+    return values
+
+DISTRIBUTIONS = {
+    'normal': sample_normal,
+    'poisson': sample_poisson,
+    'negative_binomial': sample_negative_binomial,
+    'zero_inflated': sample_zero_inflated
+}
+
+# Joint sampling: correlated standard normal scores are mapped through each
+# stat's marginal quantile function (a Gaussian copula)
+
+def standard_normal_cdf(z):
+    # Abramowitz & Stegun 7.1.26 erf approximation, max error 1.5e-7
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+def count_quantiles(pmf, z, zero_rate=0.0):
+    """Map normal scores to counts by inverting a (zero-inflated) pmf table"""
+    cdf = np.cumsum(pmf)
+    cdf = zero_rate + (1 - zero_rate) * cdf
+    counts = np.searchsorted(cdf, standard_normal_cdf(z), side='left')
+    return np.minimum(counts, len(pmf) - 1)
+
+def poisson_pmf(mean, k_max):
+    k = np.arange(1, k_max + 1)
+    return np.exp(-mean) * np.concatenate(([1.0], np.cumprod(mean / k)))
+
+def negative_binomial_pmf(n, p, k_max):
+    k = np.arange(1, k_max + 1)
+    return p ** n * np.concatenate(([1.0], np.cumprod((k - 1 + n) / k * (1 - p))))
+
+def pmf_support(mean, std):
+    return int(np.ceil(mean + 12 * std + 10))
+
+def normal_quantiles(z, mean, std, zero_rate=0.0):
+    values = mean + std * z
+    np.maximum(values, 0, out=values)
+    np.round(values, 1, out=values)
+    return values
+
+def poisson_quantiles(z, mean, std, zero_rate=0.0):
+    mean = max(mean, 0.0)
+    return count_quantiles(poisson_pmf(mean, pmf_support(mean, np.sqrt(mean))), z)
+
+def negative_binomial_quantiles(z, mean, std, zero_rate=0.0):
+    params = negative_binomial_params(mean, std ** 2)
+    if params is None:
+        return poisson_quantiles(z, mean, std)
+    return count_quantiles(negative_binomial_pmf(params[0], params[1], pmf_support(mean, std)), z)
+
+def zero_inflated_quantiles(z, mean, std, zero_rate=0.0):
+    zero_rate = min(max(zero_rate, 0.0), 0.95)
+    if mean <= 0 or zero_rate == 0:
+        return negative_binomial_quantiles(z, mean, std)
+    count_mean, count_std = zero_inflated_count_moments(mean, std, zero_rate)
+    params = negative_binomial_params(count_mean, count_std ** 2)
+    if params is None:
+        pmf = poisson_pmf(count_mean, pmf_support(count_mean, np.sqrt(count_mean)))
+    else:
+        pmf = negative_binomial_pmf(params[0], params[1], pmf_support(count_mean, count_std))
+    return count_quantiles(pmf, z, zero_rate)
+
+QUANTILE_TRANSFORMS = {
+    'normal': normal_quantiles,
+    'poisson': poisson_quantiles,
+    'negative_binomial': negative_binomial_quantiles,
+    'zero_inflated': zero_inflated_quantiles
+}
+
+def register_distribution(name, sampler, quantiles=None):
+    """Add a distribution; quantiles (normal scores -> values) enables joint sampling"""
+    DISTRIBUTIONS[name] = sampler
+    if quantiles is not None:
+        QUANTILE_TRANSFORMS[name] = quantiles
+
+def nearest_correlation(corr):
+    """Clip a sample correlation matrix to a valid (positive definite) one"""
+    corr = np.nan_to_num(np.asarray(corr, dtype=float))
+    corr = (corr + corr.T) / 2
+    np.fill_diagonal(corr, 1.0)
+    eigvals, eigvecs = np.linalg.eigh(corr)
+    corr = eigvecs @ np.diag(np.clip(eigvals, 1e-6, None)) @ eigvecs.T
+    scale = np.sqrt(np.diag(corr))
+    return corr / np.outer(scale, scale)
+
+def correlated_normal_scores(rng, corr, n_simulations):
+    chol = np.linalg.cholesky(nearest_correlation(corr))
+    return rng.standard_normal((n_simulations, len(chol))) @ chol.T
+
+COMBOS = {
+    'PRA': ['PTS', 'REB', 'AST'],
+    'PR': ['PTS', 'REB'],
+    'PA': ['PTS', 'AST']
+}
+
+class SimulationResult:
+    """Array-backed simulation output: one row per trial, one column per stat"""
+
+    def __init__(self, values, stats=STATS):
+        self.values = values
+        self.stats = list(stats)
+        self.converged = True  # adaptive runs set this when they hit the trial cap
+
+    def __getitem__(self, stat):
+        if stat in COMBOS:
+            return sum(self[part] for part in COMBOS[stat])
+        return self.values[:, self.stats.index(stat)]
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    @property
+    def n_trials(self):
+        return self.values.shape[0]
+
+    @property
+    def PRA(self):
+        return self['PRA']
+
+    @property
+    def PR(self):
+        return self['PR']
+
+    @property
+    def PA(self):
+        return self['PA']
+
+    def to_frame(self, combos=False):
+        df = pd.DataFrame(self.values, columns=self.stats)
+        if combos:
+            for combo in COMBOS:
+                df[combo] = self[combo]
+        return df
+
+def stat_params(player_sim_data, stats=STATS):
+    means = np.array([float(player_sim_data['adj_rolling_stats'][stat]) for stat in stats])
+    stds = np.array([float(player_sim_data['rolling_std'][stat]) for stat in stats])
+    zero_rates = np.array([float(player_sim_data.get('zero_rate', {}).get(stat, 0.0)) for stat in stats])
+    return means, stds, zero_rates
+
+def stream_seed(*keys, root_seed=None):
+    """Independent RNG stream for a player or game, derived from the root seed.
+
+    Streams are keyed by ids rather than spawn order, so a player's draws are
+    the same no matter how many workers run or in what order.
+    """
+    root = np.random.SeedSequence(SIMULATION_DEFAULTS['seed'] if root_seed is None else root_seed)
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + tuple(int(k) for k in keys))
+
+def draw_trials(rng, player_sim_data, n_simulations, distributions=None, correlated=None):
+    """One batch of trials as an (n_simulations, len(STATS)) float32 array"""
+    distributions = distributions or SIMULATION_DEFAULTS['distributions']
+    if correlated is None:
+        correlated = SIMULATION_DEFAULTS['correlated']
+
+    means, stds, zero_rates = stat_params(player_sim_data)
+    values = np.empty((n_simulations, len(STATS)), dtype=np.float32)
+    if correlated:
+        # Draw correlated scores for all trials at once, then apply each marginal
+        corr = player_sim_data.get('stat_corr', np.eye(len(STATS)))
+        scores = correlated_normal_scores(rng, corr, n_simulations)
+        for i, stat in enumerate(STATS):
+            quantiles = QUANTILE_TRANSFORMS[distributions.get(stat, 'normal')]
+            values[:, i] = quantiles(scores[:, i], means[i], stds[i], zero_rate=zero_rates[i])
+    else:
+        # Draw every trial of a stat in one call from its configured distribution
+        for i, stat in enumerate(STATS):
+            sampler = DISTRIBUTIONS[distributions.get(stat, 'normal')]
+            values[:, i] = sampler(rng, means[i], stds[i], n_simulations, zero_rate=zero_rates[i])
+    return values
+
+def run_monte_carlo_sim(player_sim_data, n_simulations, seed=None, as_frame=True, distributions=None,
+                        correlated=None):
     print('Data fetched!')
-    np.random.seed(42)  # For reproducibility
-
-    sim_results = {
-        'PTS': [],
-        'REB': [],
-        'AST': []
-    }
-
-    for trial in range(n_simulations):
-        if trial % 5000 == 0 and trial > 0:  # Fixed: was checking if trial == n_simulations
-            print(f'Trial number {trial}')
-        for stat in ['PTS', 'REB', 'AST']:
-            mean = float(player_sim_data['adj_rolling_stats'][stat])
-            std = float(player_sim_data['rolling_std'][stat])
-
-            # Sample from normal distribution
-            value = np.random.normal(loc=mean, scale=std)
-            value = max(0, round(value, 1))  # Clamp to 0, round to 1 decimal
-            sim_results[stat].append(value)
-
-    return pd.DataFrame(sim_results)
\ No newline at end of file
+    if seed is None:
+        seed = stream_seed(player_sim_data['player_id'])
+    rng = np.random.default_rng(seed)  # For reproducibility
+
+    result = SimulationResult(draw_trials(rng, player_sim_data, n_simulations, distributions, correlated))
+    return result.to_frame() if as_frame else result
+
+def default_lines(player_sim_data):
+    # Prop-style half-point line just below each projected mean
+    means, _, _ = stat_params(player_sim_data)
+    return {stat: [float(np.floor(mean)) + 0.5] for stat, mean in zip(STATS, means)}
+
+class ConvergenceTracker:
+    """Running sums behind the adaptive stopping rule.
+
+    Each batch is folded in once (sums, squares, over-line counts and its own
+    quantiles), so a convergence check costs the same however many batches
+    came before it.
+    """
+    def __init__(self, quantiles, lines):
+        self.quantiles = quantiles
+        self.lines = [np.asarray(lines.get(stat, []), dtype=float) for stat in STATS]
+        self.n = 0
+        self.total = np.zeros(len(STATS))
+        self.total_sq = np.zeros(len(STATS))
+        self.over = [np.zeros(len(stat_lines)) for stat_lines in self.lines]
+        self.batch_quantiles = []  # one (quantiles, stats) array per batch
+
+    def add(self, batch):
+        values = batch.astype(np.float64)
+        self.n += len(values)
+        self.total += values.sum(axis=0)
+        self.total_sq += (values ** 2).sum(axis=0)
+        for i, stat_lines in enumerate(self.lines):
+            self.over[i] += (values[:, i, None] > stat_lines).sum(axis=0)
+        if self.quantiles:
+            self.batch_quantiles.append(np.quantile(values, self.quantiles, axis=0))
+
+    def errors(self):
+        """Largest standard error of each kind of tracked output (mean, quantile, prob).
+
+        Means and over-probabilities use their closed-form errors; quantiles use the
+        spread of per-batch estimates (batch means).
+        """
+        n = self.n
+        variance = np.maximum(self.total_sq / n - (self.total / n) ** 2, 0)
+        errors = {'mean': float(np.sqrt(variance / n).max()), 'quantile': 0.0, 'prob': 0.0}
+        for over in self.over:
+            if len(over):
+                p_over = over / n
+                errors['prob'] = max(errors['prob'], float(np.sqrt(p_over * (1 - p_over) / n).max()))
+        if len(self.batch_quantiles) > 1:
+            batch_q = np.array(self.batch_quantiles)
+            errors['quantile'] = float((batch_q.std(axis=0, ddof=1) / np.sqrt(len(batch_q))).max())
+        return errors
+
+def run_adaptive_sim(player_sim_data, seed=None, settings=None, lines=None, distributions=None, correlated=None):
+    """Simulate in batches until every tracked output is within tolerance or the cap is hit.
+
+    Returns a SimulationResult with n_trials and converged set.
+    """
+    settings = settings or SIMULATION_DEFAULTS['adaptive']
+    lines = lines or settings.get('lines') or default_lines(player_sim_data)
+    if seed is None:
+        seed = stream_seed(player_sim_data['player_id'])
+    rng = np.random.default_rng(seed)
+
+    batch_size = settings['batch_size']
+    batches = []
+    tracker = ConvergenceTracker(settings['quantiles'], lines)
+    converged = False
+    while len(batches) * batch_size < settings['max_trials']:
+        batches.append(draw_trials(rng, player_sim_data, batch_size, distributions, correlated))
+        tracker.add(batches[-1])
+        if len(batches) * batch_size < settings['min_trials']:
+            continue
+        errors = tracker.errors()
+        if all(errors[kind] <= settings['tolerance'][kind] for kind in errors):
+            converged = True
+            break
+
+    result = SimulationResult(np.concatenate(batches))
+    result.converged = converged
+    return result
+
+def run_streaming_sim(player_sim_data, n_simulations, seed=None, batch_size=None, distributions=None,
+                      correlated=None):
+    """Fold n_simulations trials into a SimulationSummary one batch at a time.
+
+    Memory stays at one batch no matter how many trials are drawn.
+    """
+    from src.model.accumulators import SimulationSummary
+
+    batch_size = batch_size or SIMULATION_DEFAULTS['streaming']['batch_size']
+    if seed is None:
+        seed = stream_seed(player_sim_data['player_id'])
+    rng = np.random.default_rng(seed)
+
+    summary = SimulationSummary()
+    for start in range(0, n_simulations, batch_size):
+        size = min(batch_size, n_simulations - start)
+        summary.update(draw_trials(rng, player_sim_data, size, distributions, correlated))
+    return summary
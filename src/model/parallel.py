@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.model.accumulators import merge_summaries
+from src.model.monte_carlo import run_monte_carlo_sim, run_adaptive_sim, run_streaming_sim, stream_seed
+from src.utils.constants import SIMULATION_DEFAULTS
+
+# Process-pool fan-out of per-player simulations
+
+def simulate_job(job):
+    key, player_sim_data, n_simulations, seed = job
+    if n_simulations is None:
+        return key, run_adaptive_sim(player_sim_data, seed=seed)
+    return key, run_monte_carlo_sim(player_sim_data, n_simulations, seed=seed, as_frame=False)
+
+def simulate_players(player_sim_data_by_key, n_simulations, workers=None):
+    """Simulate many players, returning {key: SimulationResult}.
+
+    Each player's stream comes from stream_seed(player_id), so results are the
+    same for any worker count. n_simulations=None runs the adaptive mode.
+    """
+    workers = workers or SIMULATION_DEFAULTS['workers']
+    jobs = [(key, data, n_simulations, stream_seed(data['player_id']))
+            for key, data in player_sim_data_by_key.items()]
+
+    if workers <= 1 or len(jobs) <= 1:
+        return dict(simulate_job(job) for job in jobs)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs), os.cpu_count() or 1)) as pool:
+        return dict(pool.map(simulate_job, jobs))
+
+def summarize_job(job):
+    key, player_sim_data, n_simulations, seed = job
+    return key, run_streaming_sim(player_sim_data, n_simulations, seed=seed)
+
+def summarize_players(player_sim_data_by_key, n_simulations, workers=None):
+    """Streaming counterpart of simulate_players, returning {key: SimulationSummary}.
+
+    Each player's trials are split into fixed-size chunks with their own
+    streams (player id, chunk index); workers summarize chunks and the partial
+    summaries are merged, so the result does not depend on the worker count.
+    """
+    workers = workers or SIMULATION_DEFAULTS['workers']
+    chunk_size = SIMULATION_DEFAULTS['streaming']['chunk_size']
+    jobs = []
+    for key, data in player_sim_data_by_key.items():
+        for chunk, start in enumerate(range(0, n_simulations, chunk_size)):
+            size = min(chunk_size, n_simulations - start)
+            jobs.append((key, data, size, stream_seed(data['player_id'], chunk)))
+
+    if workers <= 1 or len(jobs) <= 1:
+        partials = [summarize_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs), os.cpu_count() or 1)) as pool:
+            partials = list(pool.map(summarize_job, jobs))
+
+    return {key: merge_summaries(summary for k, summary in partials if k == key)
+            for key in player_sim_data_by_key}
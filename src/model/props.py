@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src.model.accumulators import RESOLUTION
+
+# Prop-line queries: each player/stat distribution is reduced once to a sorted
+# grid of values with cumulative counts, then every line is answered with one
+# searchsorted over that grid
+
+def value_cdf(source, stat):
+    """(sorted values, cumulative trial counts) for a SimulationResult or SimulationSummary"""
+    if hasattr(source, 'summaries'):
+        counts = source[stat].histogram.counts
+        bins = np.flatnonzero(counts)
+        return bins / RESOLUTION, np.cumsum(counts[bins])
+    # Round off float32 noise so lines like 12.3 compare equal to stored 12.3
+    values = np.round(np.sort(np.asarray(source[stat], dtype=np.float64)), 4)
+    return values, np.arange(1, len(values) + 1)
+
+def count_at_most(grid, cumulative, x, strict=False):
+    """Trials <= x (or < x when strict) for an array of x"""
+    idx = np.searchsorted(grid, x, side='left' if strict else 'right') - 1
+    return np.where(idx >= 0, cumulative[np.maximum(idx, 0)], 0)
+
+def as_frame(queries):
+    return queries if isinstance(queries, pd.DataFrame) else pd.DataFrame(list(queries))
+
+def query_lines(results, queries):
+    """Over/under/push probabilities for many player, stat and line queries.
+
+    results maps player names to SimulationResult or SimulationSummary; queries
+    is a DataFrame or list of dicts with PLAYER, STAT (PTS, REB, AST, PRA, PR, PA)
+    and LINE. Returns the queries with P_OVER, P_UNDER and P_PUSH added.
+    """
+    table = as_frame(queries).reset_index(drop=True)
+    table['LINE'] = table['LINE'].astype(float)
+    for col in ['P_OVER', 'P_UNDER', 'P_PUSH']:
+        table[col] = np.nan
+
+    for (player, stat), rows in table.groupby(['PLAYER', 'STAT'], sort=False):
+        if player not in results:
+            continue
+        grid, cumulative = value_cdf(results[player], stat)
+        n = cumulative[-1]
+        lines = rows['LINE'].to_numpy()
+        at_most = count_at_most(grid, cumulative, lines)
+        below = count_at_most(grid, cumulative, lines, strict=True)
+        table.loc[rows.index, 'P_OVER'] = (n - at_most) / n
+        table.loc[rows.index, 'P_UNDER'] = below / n
+        table.loc[rows.index, 'P_PUSH'] = (at_most - below) / n
+    return table
+
+def query_ranges(results, queries):
+    """P(LOW <= stat <= HIGH) for many player, stat and range queries"""
+    table = as_frame(queries).reset_index(drop=True)
+    table['P_RANGE'] = np.nan
+
+    for (player, stat), rows in table.groupby(['PLAYER', 'STAT'], sort=False):
+        if player not in results:
+            continue
+        grid, cumulative = value_cdf(results[player], stat)
+        high = count_at_most(grid, cumulative, rows['HIGH'].to_numpy(dtype=float))
+        low = count_at_most(grid, cumulative, rows['LOW'].to_numpy(dtype=float), strict=True)
+        table.loc[rows.index, 'P_RANGE'] = (high - low) / cumulative[-1]
+    return table
@@ -1,60 +1,110 @@
-import time
-from nba_api.stats.endpoints import playergamelog
-
-def calculate_usage_rate(player_id, home_id, opp_id):
-    from src.data.api_client import calculate_team_possessions
-    from src.data.data_processor import on_court_teammates
-    
-    def calculate_base_usage(curr_id):
-        team_possession = calculate_team_possessions(home_id, opp_id)
-        gamelog = playergamelog.PlayerGameLog(
-            player_id=curr_id,
-            season='2025',
-            season_type_all_star='Regular Season',
-            league_id_nullable='10'
-        ).get_data_frames()[0]
-        if not gamelog.empty:
-            recent_games = gamelog.head(10)
-            rolling_fga = recent_games['FGA'].mean()
-            rolling_fta = recent_games['FTA'].mean()
-            rolling_tov = recent_games['TOV'].mean()
-            base_usage = (rolling_fga + 0.44 * rolling_fta + rolling_tov) / team_possession
-            time.sleep(1)
-            return base_usage
-        return 0.2  # default usage rate
-
-    def calculate_usage_multiplier():
-        co_players = on_court_teammates(player_id)
-        if not co_players:
-            return 1.0
-            
-        teammate_usages_total = 0
-        valid_teammates = 0
-        for c_id in co_players:
-            usage = calculate_base_usage(c_id)
-            if usage > 0:
-                teammate_usages_total += usage
-                valid_teammates += 1
-        
-        if valid_teammates == 0:
-            return 1.0
-            
-        avg_teammate_usage = teammate_usages_total / valid_teammates
-
-        if avg_teammate_usage >= 0.28:
-            return 0.88  # Very high-usage teammates 
-        elif avg_teammate_usage >= 0.24:
-            return 0.93  # High-usage teammates
-        elif avg_teammate_usage >= 0.20:
-            return 0.98  # Slightly reduced usage
-        elif avg_teammate_usage >= 0.16:
-            return 1.02  # Slightly boosted usage
-        elif avg_teammate_usage >= 0.12:
-            return 1.07  # Weak on-court group
-        else:
-            return 1.12  # Bench-heavy group
-
-    base_usage = calculate_base_usage(player_id)
-    usage_multiplier = calculate_usage_multiplier()
-    usage_rate = base_usage * usage_multiplier
-    return usage_rate
\ No newline at end of file
+import numpy as np
+import pandas as pd
+
+# Teammate-adjusted usage for whole rosters at once: base usage from rolling
+# features, each player's top four teammates from the team's shared-minutes
+# matrix and a multiplier from their average usage. The teammate lists are
+# also what the graph's 'teammates' node returns
+
+N_TEAMMATES = 4
+DEFAULT_USAGE = 0.2
+
+# Average teammate usage thresholds (highest first) and the multiplier each one gives
+USAGE_THRESHOLDS = [0.28, 0.24, 0.20, 0.16, 0.12]
+USAGE_MULTIPLIERS = [
+    0.88,  # Very high-usage teammates
+    0.93,  # High-usage teammates
+    0.98,  # Slightly reduced usage
+    1.02,  # Slightly boosted usage
+    1.07   # Weak on-court group
+]
+BENCH_MULTIPLIER = 1.12  # Bench-heavy group
+
+def usage_multiplier(avg_teammate_usage):
+    avg = np.asarray(avg_teammate_usage, dtype=float)
+    return np.select([avg >= t for t in USAGE_THRESHOLDS], USAGE_MULTIPLIERS, BENCH_MULTIPLIER)
+
+def top_teammates(shared, n=N_TEAMMATES):
+    """Column indices of each row's n largest shared-minutes teammates (never the player)"""
+    shared = np.array(shared, dtype=float)
+    np.fill_diagonal(shared, -np.inf)
+    n = min(n, shared.shape[1] - 1)
+    return np.argsort(-shared, axis=1, kind='stable')[:, :n]
+
+def compute_roster_teammates(roster_ids):
+    """{player id: ids of their top teammates by shared minutes} for roster players with games"""
+    from src.data.api_client import get_player_gamelog
+    from src.data.data_processor import shared_minutes_frame
+
+    logs = [get_player_gamelog(pid)[['GAME_DATE', 'MIN']].assign(PLAYER_ID=pid) for pid in roster_ids]
+    logs = [log for log in logs if not log.empty]
+    if len(logs) < 2:
+        return {}
+    shared = shared_minutes_frame(pd.concat(logs, ignore_index=True), 'PLAYER_ID')
+    ids = shared.index.to_numpy()
+    return {pid: tuple(ids[row].tolist()) for pid, row in zip(ids.tolist(), top_teammates(shared.to_numpy()))}
+
+def get_roster_teammates(roster_ids):
+    """Top teammates for a roster, computed once per run"""
+    from src.model.graph import projection_graph
+    return projection_graph.get('roster_teammates', tuple(sorted(set(roster_ids))))
+
+def player_teammates(player_id):
+    """A player's top teammates from their team's roster (empty without games)"""
+    from src.data.api_client import get_team_id_from_player_id, team_roster_ids
+    return get_roster_teammates(team_roster_ids(get_team_id_from_player_id(player_id))).get(player_id, ())
+
+def compute_usage_table(roster_ids, team_possessions):
+    """Per-player base usage, top teammates, multiplier and usage rate for one roster"""
+    from src.model.graph import projection_graph
+
+    roster_ids = list(roster_ids)
+    usage_poss = np.array([
+        f['USAGE_POSS'] if f is not None else np.nan
+        for f in (projection_graph.get('features', pid) for pid in roster_ids)
+    ])
+    base_usage = np.where(np.isnan(usage_poss), DEFAULT_USAGE, usage_poss / team_possessions)
+
+    table = pd.DataFrame({'BASE_USAGE': base_usage}, index=pd.Index(roster_ids, name='PLAYER_ID'))
+    table['TEAMMATES'] = [()] * len(table)
+    table['TEAMMATE_USAGE'] = np.nan
+    table['MULTIPLIER'] = 1.0
+
+    # Same teammate lists the rebound and assist factors use
+    teammates = get_roster_teammates(roster_ids)
+    if teammates:
+        ids = list(teammates)
+        rows = np.array([teammates[pid] for pid in ids]).reshape(len(ids), -1)
+        # Average usage of each player's teammates, skipping non-positive usages
+        teammate_usage = base_usage[table.index.get_indexer(rows.ravel())].reshape(rows.shape)
+        valid = teammate_usage > 0
+        counts = valid.sum(axis=1)
+        avg = np.where(counts > 0, np.where(valid, teammate_usage, 0).sum(axis=1) / np.maximum(counts, 1), np.nan)
+
+        table.loc[ids, 'TEAMMATES'] = pd.Series([teammates[pid] for pid in ids], index=ids)
+        table.loc[ids, 'TEAMMATE_USAGE'] = avg
+        table.loc[ids, 'MULTIPLIER'] = np.where(counts > 0, usage_multiplier(avg), 1.0)
+
+    table['USAGE_RATE'] = table['BASE_USAGE'] * table['MULTIPLIER']
+    return table
+
+def get_usage_table(team_id, roster_ids, team_possessions):
+    """Usage table for a roster, computed once per run"""
+    from src.model.graph import projection_graph
+    return projection_graph.get('usage_table', team_id, tuple(sorted(set(roster_ids))), team_possessions)
+
+def get_game_usage_tables(context):
+    """Usage tables for both rosters of a game; projections index these"""
+    return {team_id: get_usage_table(team_id, roster, context.team_possessions)
+            for team_id, roster in context.rosters.items()}
+
+def lookup_usage_rate(table, player_id):
+    return float(table['USAGE_RATE'].get(player_id, DEFAULT_USAGE))
+
+def calculate_usage_rate(player_id, home_id, opp_id, team_possessions=None):
+    """Usage rate outside a game context, from the home team's roster table"""
+    from src.data.api_client import team_roster_ids
+    from src.model.graph import projection_graph
+
+    team_possession = team_possessions or projection_graph.get('possessions', home_id, opp_id)
+    return lookup_usage_rate(get_usage_table(home_id, team_roster_ids(home_id), team_possession), player_id)
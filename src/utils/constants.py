@@ -1,3 +1,4 @@
+import os
 from nba_api.stats.static import teams
 
 TEAM1 = "Lynx"
@@ -22,33 +23,99 @@ TARGETPLAYERS = {
 # For backward compatibility, create a flat list
 TARGETPLAYERS_FLAT = TARGETPLAYERS['TEAM1'] + TARGETPLAYERS['TEAM2']
 
-def get_team_rosters():
-    from src.data.api_client import team_lookup
-    
-    TEAM1ID = teams.find_wnba_teams_by_nickname(TEAM1)[0]['id']
-    TEAM2ID = teams.find_wnba_teams_by_nickname(TEAM2)[0]['id']
+def get_team_ids(team_1=None, team_2=None):
+    """Team IDs from nicknames (static data, no request)"""
+    TEAM1ID = teams.find_wnba_teams_by_nickname(team_1 or TEAM1)[0]['id']
+    TEAM2ID = teams.find_wnba_teams_by_nickname(team_2 or TEAM2)[0]['id']
+    return TEAM1ID, TEAM2ID
 
-    ROSTERTEAM1DF = team_lookup(TEAM1ID).get_data_frames()[0]
-    ROSTERTEAM2DF = team_lookup(TEAM2ID).get_data_frames()[0]
+def get_team_rosters(team_1=None, team_2=None):
+    from src.data.api_client import team_roster_ids
     
-    TEAM1PLAYERIDS = ROSTERTEAM1DF['PLAYER_ID'].tolist()
-    TEAM2PLAYERIDS = ROSTERTEAM2DF['PLAYER_ID'].tolist()
+    TEAM1ID, TEAM2ID = get_team_ids(team_1, team_2)
+
+    # Same rosters the usage tables and teammate lookups use
+    TEAM1PLAYERIDS = team_roster_ids(TEAM1ID)
+    TEAM2PLAYERIDS = team_roster_ids(TEAM2ID)
     
     return TEAM1PLAYERIDS, TEAM2PLAYERIDS, TEAM1ID, TEAM2ID
 
-def get_player_team_assignment(player_name):
+def get_player_team_assignment(player_name, target_players=None):
     """Determine which team a player belongs to"""
-    if player_name in TARGETPLAYERS['TEAM1']:
+    target_players = target_players or TARGETPLAYERS
+    if player_name in target_players['TEAM1']:
         return 'TEAM1'
-    elif player_name in TARGETPLAYERS['TEAM2']:
+    elif player_name in target_players['TEAM2']:
         return 'TEAM2'
     else:
         return None
 
+# distributions: per-stat sampler from the registry in monte_carlo.py
+# ('normal', 'poisson', 'negative_binomial' or 'zero_inflated'); correlated draws PTS/REB/AST
+# jointly using the player's recent-game correlation. engine 'player' simulates each target on its
+# own; 'game' simulates both rotations possession by possession from one shared pace per trial
 SIMULATION_DEFAULTS = {
     'n_simulations': 20000,
     'season': '2025',
-    'recent_games': 10
+    'recent_games': 10,
+    'distributions': {
+        'PTS': 'negative_binomial',
+        'REB': 'negative_binomial',
+        'AST': 'negative_binomial'
+    },
+    'correlated': True,
+    'engine': 'player',
+    'rotation_size': 5,
+    'pace_std': 0.05,  # trial-to-trial pace spread, as a fraction of projected possessions
+    'seed': 42,  # root seed; every player and game gets its own stream derived from it
+    'workers': 1,  # processes used to simulate players in parallel
+    'graph_report': False,  # print the projection graph with per-node timings after a run
+    # Adaptive mode simulates in batches until the standard error of the mean, the tracked
+    # quantiles and the over probabilities at each line (default: half point below the
+    # projection) are all within tolerance, capped at max_trials
+    'adaptive': {
+        'enabled': False,
+        'batch_size': 5000,
+        'min_trials': 10000,
+        'max_trials': 500000,
+        'quantiles': [0.25, 0.5, 0.75, 0.9],
+        'lines': None,
+        'tolerance': {
+            'mean': 0.02,
+            'quantile': 0.1,
+            'prob': 0.0025
+        }
+    },
+    # Streaming mode folds trials into mergeable summaries (moments and exact histograms)
+    # instead of keeping them, so memory is one batch regardless of n_simulations
+    'streaming': {
+        'enabled': False,
+        'batch_size': 100000,  # trials drawn at a time
+        'chunk_size': 1000000  # trials per parallel job, each with its own stream
+    }
+}
+
+# Request gateway: requests per second budget, burst size and retry/backoff for transient errors.
+# mode is 'live' (network), 'record' (network + save fixtures) or 'replay' (fixtures only, offline)
+API_SETTINGS = {
+    'mode': os.environ.get('WNBA_API_MODE', 'live'),
+    'fixtures_dir': os.path.join('fixtures', 'nba_api'),
+    'requests_per_second': 1.0,
+    'burst': 2,
+    'max_retries': 4,
+    'backoff_base': 1.0,
+    'backoff_max': 30.0,
+    'timeout': 30,
+    'retry_statuses': [429, 500, 502, 503, 504],  # rate limited or server-side failures
+    'prefetch_workers': 4
+}
+
+# 'league' pulls every player's game log in one bulk request, 'player' fetches one log per player.
+# With season_store on, game logs, rosters and team stats are read from the local store (see sync.py)
+DATA_SETTINGS = {
+    'gamelog_source': 'league',
+    'season_store': False,
+    'season_store_dir': os.path.join('data', 'season_store')
 }
 
 ROLLINGLEAGUE_EFG = 0.52  # Approximate WNBA league average
@@ -65,4 +132,21 @@ COMMON_PARAMS = {
     'rank': 'N',
     'month': 0,
     'period': 0
-}
\ No newline at end of file
+}
+
+# Response cache: TTLs in seconds per endpoint, 'next_game' expires when the next scheduled game
+# (tip-off + game_length seconds) is over, or at midnight if the schedule can't be read
+CACHE_SETTINGS = {
+    'enabled': True,
+    'cache_dir': os.path.join('.cache', 'nba_api'),
+    'max_bytes': 200 * 1024 * 1024,
+    'ttl': {
+        'CommonTeamRoster': 3 * 24 * 3600,
+        'CommonPlayerInfo': 7 * 24 * 3600,
+        'PlayerGameLog': 'next_game',
+        'PlayerGameLogs': 'next_game',
+        'LeagueDashTeamStats': 'next_game',
+        'default': 24 * 3600
+    },
+    'game_length': 3 * 3600
+}
@@ -1,51 +1,74 @@
 from datetime import datetime
-from nba_api.stats.static import players
 import pandas as pd
 import numpy as np
 import os
 
 # Fixed imports
 from src.model.matchup_analyzer import get_primary_defender_matchup
-from src.model.monte_carlo import run_monte_carlo_sim
-from src.utils.constants import TARGETPLAYERS, TARGETPLAYERS_FLAT, TEAM1, TEAM2, get_team_rosters, get_player_team_assignment
+from src.model.parallel import simulate_players, summarize_players
+from src.model.matchup_context import build_matchup_context
+from src.model.game_sim import run_game_sim
+from src.model.graph import projection_graph
+from src.data.cache import response_cache
+from src.data.store import run_store
+from src.data.prefetch import prefetch_teams, prefetch_players
+from src.data.api_client import find_player_id
+from src.utils.results_io import (results_path, save_results, load_results, read_index, summaries_path,
+                                  save_summaries, load_summaries)
+from src.model.monte_carlo import COMBOS
+from src.utils.constants import TARGETPLAYERS, TEAM1, TEAM2, SIMULATION_DEFAULTS, get_team_ids, get_team_rosters, get_player_team_assignment
 
 # File management and output
 
-def create_output_folder():
+def create_output_folder(team_1=None, team_2=None, date_str=None):
     # Create timestamped folder name
-    today_str = datetime.today().strftime('%Y-%m-%d')
-    folder_name = f"{TEAM1.lower()}_vs_{TEAM2.lower()}_{today_str}"
+    team_1, team_2 = team_1 or TEAM1, team_2 or TEAM2
+    today_str = date_str or datetime.today().strftime('%Y-%m-%d')
+    folder_name = f"{team_1.lower()}_vs_{team_2.lower()}_{today_str}"
     output_folder = os.path.join('sim_results', folder_name)
     os.makedirs(output_folder, exist_ok=True)
     return output_folder
 
-def save_simulation_results():
-    """Run simulations for all target players and save results"""
-    # Get team rosters
-    TEAM1PLAYERIDS, TEAM2PLAYERIDS, TEAM1ID, TEAM2ID = get_team_rosters()
-    
-    # Create output folder
-    output_folder = create_output_folder()
-    
-    for player_name in TARGETPLAYERS_FLAT:
-        output_file = os.path.join(output_folder, f"{player_name.replace(' ', '_').lower()}_sim.csv")
+def make_game(team_1=None, team_2=None, target_players=None):
+    """One game to simulate: team nicknames and target players keyed 'TEAM1'/'TEAM2'"""
+    return {
+        'team1': team_1 or TEAM1,
+        'team2': team_2 or TEAM2,
+        'target_players': target_players or TARGETPLAYERS
+    }
+
+def project_game(game, rosters, output_folder, date_str=None):
+    """Build one game's context and project its target players that are not saved yet.
 
+    date_str is the slate date (default today); it keys the defender matching.
+    """
+    TEAM1PLAYERIDS, TEAM2PLAYERIDS, TEAM1ID, TEAM2ID = rosters
+    target_players = game['target_players']
+
+    # Possessions and defender assignments are shared by every player in the game
+    context = build_matchup_context(TEAM1PLAYERIDS, TEAM2PLAYERIDS, TEAM1ID, TEAM2ID, date_str)
+
+    # Every player's trials go into one binary file per matchup
+    output_file = results_path(output_folder, game['team1'], game['team2'])
+    simulated = set(read_index(output_file)[0]) if os.path.exists(output_file) else set()
+
+    projections = {}
+    for player_name in target_players['TEAM1'] + target_players['TEAM2']:
         # Skip if already exists
-        if os.path.exists(output_file):
+        if player_name in simulated:
             print(f"Skipping {player_name}, already simulated.")
             continue
 
         try:
-            player_data = players.find_wnba_players_by_full_name(player_name)
-            if not player_data:
+            player_id = find_player_id(player_name)
+            if player_id is None:
                 print(f"Player not found: {player_name}")
                 continue
-                
-            player_id = player_data[0]['id']
+
             print(f"\nRunning simulation for {player_name} (ID: {player_id})")
 
             # Determine which team the player belongs to
-            player_team = get_player_team_assignment(player_name)
+            player_team = get_player_team_assignment(player_name, target_players)
             
             if player_team == 'TEAM1':
                 # Player is on Team 1, so Team 1 is home, Team 2 is opponent
@@ -59,34 +82,150 @@ def save_simulation_results():
                 print(f"Could not determine team for {player_name}, skipping...")
                 continue
 
-            player_sim_data = get_primary_defender_matchup(home_team_ids, opp_team_ids, player_id)
+            player_sim_data = get_primary_defender_matchup(home_team_ids, opp_team_ids, player_id, context=context)
 
             # Clamp std dev
             max_pts_std = player_sim_data['est_fga'] * 1.5
             player_sim_data['rolling_std']['PTS'] = min(player_sim_data['rolling_std']['PTS'], max_pts_std)
 
-            # Simulate
-            df_sim = run_monte_carlo_sim(player_sim_data, n_simulations=20000)
-            df_sim['PLAYER'] = player_name
-            df_sim['TEAM'] = TEAM1 if player_team == 'TEAM1' else TEAM2
-
-            # Save immediately
-            df_sim.to_csv(output_file, index=False)
-            print(f"Saved: {output_file}")
+            projections[player_name] = {
+                'player_id': player_id,
+                'team': game['team1'] if player_team == 'TEAM1' else game['team2'],
+                'sim_data': player_sim_data
+            }
 
         except Exception as e:
             print(f"Error simulating {player_name}: {e}")
-    
-    return output_folder
+
+    return context, projections
+
+def check_engine_settings():
+    """Adaptive and streaming runs are per-player; the game engine supports neither"""
+    if SIMULATION_DEFAULTS['engine'] != 'game':
+        return
+    for mode in ['adaptive', 'streaming']:
+        if SIMULATION_DEFAULTS[mode]['enabled']:
+            raise ValueError(f"SIMULATION_DEFAULTS['{mode}'] is not supported with engine='game'; "
+                             f"disable it or use engine='player'")
+
+def simulate_games(contexts, projections_by_game):
+    """Simulate every game's projected players, returning one {player name: result} per game.
+
+    In the player engine all players of all games are scheduled on the same workers.
+    """
+    check_engine_settings()
+    n_simulations = SIMULATION_DEFAULTS['n_simulations']
+    pooled = {(i, name): p['sim_data'] for i, projections in enumerate(projections_by_game)
+              for name, p in projections.items()}
+    results_by_game = [{} for _ in projections_by_game]
+
+    if pooled and SIMULATION_DEFAULTS['streaming']['enabled']:
+        # Summaries only: no per-trial files are written
+        results = summarize_players(pooled, n_simulations=n_simulations)
+    elif pooled and SIMULATION_DEFAULTS['engine'] == 'game':
+        # Both rotations share each trial's pace, possessions and rebounds
+        results = {}
+        for i, (context, projections) in enumerate(zip(contexts, projections_by_game)):
+            if not projections:
+                continue
+            game_results = run_game_sim(
+                context, {p['player_id']: p['sim_data'] for p in projections.values()},
+                n_simulations=n_simulations)
+            results.update({(i, name): game_results[p['player_id']] for name, p in projections.items()})
+    elif pooled:
+        adaptive = SIMULATION_DEFAULTS['adaptive']['enabled']
+        results = simulate_players(pooled, n_simulations=None if adaptive else n_simulations)
+        if adaptive:
+            print_trials_report({name: result for (_, name), result in results.items()})
+    else:
+        results = {}
+
+    for (i, name), result in results.items():
+        results_by_game[i][name] = result
+    return results_by_game
+
+def save_game(game, output_folder, projections, sim_results):
+    if not sim_results:
+        return
+    if SIMULATION_DEFAULTS['streaming']['enabled']:
+        save_summary(output_folder, sim_results, projections, game['team1'], game['team2'])
+        # Histograms and moments too, so analyze.py and props.py can query them
+        save_summaries(summaries_path(output_folder, game['team1'], game['team2']), sim_results,
+                       {name: p['team'] for name, p in projections.items()})
+        return
+    output_file = results_path(output_folder, game['team1'], game['team2'])
+    save_results(output_file, sim_results, {name: p['team'] for name, p in projections.items()})
+    print(f"Saved {len(sim_results)} players to: {output_file}")
+
+def run_games(games, date_str=None):
+    """Simulate a list of games (see make_game) and save one output per game.
+
+    Rosters, league game logs and team stats are fetched once for the whole
+    list, and every game's players share one simulation pool.
+    """
+    # Fail on unsupported settings before any data is fetched
+    check_engine_settings()
+
+    # Fetch all matchup data up front so the model runs from memory. Rosters,
+    # team stats and league logs only need team IDs, so they go first and the
+    # player index is then built from the prefetched rosters
+    prefetch_teams([get_team_ids(game['team1'], game['team2']) for game in games])
+
+    # Get team rosters
+    rosters = [get_team_rosters(game['team1'], game['team2']) for game in games]
+    prefetch_players(rosters)
+
+    # Create output folders
+    output_folders = [create_output_folder(game['team1'], game['team2'], date_str) for game in games]
+
+    # Project every target player first, then simulate them
+    contexts, projections_by_game = [], []
+    for game, game_rosters, output_folder in zip(games, rosters, output_folders):
+        context, projections = project_game(game, game_rosters, output_folder, date_str)
+        contexts.append(context)
+        projections_by_game.append(projections)
+
+    # Simulate
+    results_by_game = simulate_games(contexts, projections_by_game)
+
+    for game, output_folder, projections, sim_results in zip(games, output_folders, projections_by_game, results_by_game):
+        save_game(game, output_folder, projections, sim_results)
+    return output_folders
+
+def save_simulation_results(team_1=None, team_2=None, target_players=None):
+    """Run simulations for all target players and save results"""
+    return run_games([make_game(team_1, team_2, target_players)])[0]
+
+def summary_path(output_folder, team_1=None, team_2=None):
+    team_1, team_2 = team_1 or TEAM1, team_2 or TEAM2
+    return os.path.join(output_folder, f"{team_1.lower()}_vs_{team_2.lower()}_summary.csv")
+
+def save_summary(output_folder, summaries, projections, team_1=None, team_2=None):
+    """Write one row per player and stat from streaming summaries"""
+    frames = []
+    for player_name, summary in summaries.items():
+        df = summary.to_frame().rename_axis('STAT').reset_index()
+        df.insert(0, 'TEAM', projections[player_name]['team'])
+        df.insert(0, 'PLAYER', player_name)
+        frames.append(df)
+    path = summary_path(output_folder, team_1, team_2)
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+    print(f"Saved summary of {SIMULATION_DEFAULTS['n_simulations']:,} trials per player: {path}")
+    return path
+
+def print_trials_report(sim_results):
+    """Trials used per player in adaptive mode"""
+    print("\nTRIALS USED")
+    for player_name, result in sim_results.items():
+        status = "converged" if result.converged else "hit max_trials"
+        print(f"  {player_name}: {result.n_trials:,} ({status})")
 
 def combine_player_csvs(output_folder):
-    """Combine all player CSVs into one file"""
-    combined_df = pd.DataFrame()
-    
-    for fname in os.listdir(output_folder):
-        if fname.endswith('_sim.csv') and 'combined' not in fname:
-            df = pd.read_csv(os.path.join(output_folder, fname))
-            combined_df = pd.concat([combined_df, df], ignore_index=True)
+    """Combine per-player CSVs from older runs into one file"""
+    frames = [pd.read_csv(os.path.join(output_folder, fname))
+              for fname in os.listdir(output_folder)
+              if fname.endswith('_sim.csv') and 'combined' not in fname]
+    combined_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
     if not combined_df.empty:
         final_output = os.path.join(output_folder, f"{TEAM1.lower()}_vs_{TEAM2.lower()}_combined_simulations.csv")
@@ -97,8 +236,60 @@ def combine_player_csvs(output_folder):
         print("No simulation files found to combine")
         return None
 
-def analyze_simulation_results(team_1=None, team_2=None, date_str=None):
-    """Analyze and summarize simulation results from CSV files"""
+def load_simulation_results(output_folder, team_1, team_2, players=None, columns=None):
+    """Trials from a matchup folder: the binary file, or the combined CSV of older runs.
+
+    Only the requested players and stat columns are read. Returns (df, path).
+    """
+    columns = columns or ['PTS', 'REB', 'AST']
+    path = results_path(output_folder, team_1, team_2)
+    if os.path.exists(path):
+        return load_results(path, players=players, columns=columns), path
+
+    path = os.path.join(output_folder, f"{team_1.lower()}_vs_{team_2.lower()}_combined_simulations.csv")
+    needed = set(columns).union(*(COMBOS[col] for col in columns if col in COMBOS))
+    df = pd.read_csv(path, usecols=lambda col: col in needed or col in ('PLAYER', 'TEAM'))
+    # Older CSVs may lack the combo columns; sum them from their parts
+    for col in columns:
+        if col in COMBOS and col not in df:
+            df[col] = df[COMBOS[col]].sum(axis=1)
+    df = df[[col for col in df if col in columns or col in ('PLAYER', 'TEAM')]]
+    if players is not None:
+        df = df[df['PLAYER'].isin(players)]
+    return df, path
+
+def load_simulation_summaries(output_folder, team_1, team_2, players=None):
+    """Summaries a streaming run left in a matchup folder (when it has no trials file), or None"""
+    path = summaries_path(output_folder, team_1, team_2)
+    if os.path.exists(results_path(output_folder, team_1, team_2)) or not os.path.exists(path):
+        return None
+    return load_summaries(path, players=players)
+
+def summary_stats(summaries, columns):
+    """mean, std, min, max and median per player and column, shaped like the trials groupby"""
+    rows = {}
+    for name, summary in summaries.items():
+        row = {}
+        for col in columns:
+            histogram = summary[col].histogram
+            row.update({(col, 'mean'): summary.mean(col), (col, 'std'): summary.std(col),
+                        (col, 'min'): histogram.min, (col, 'max'): histogram.max,
+                        (col, 'median'): float(summary.quantile(col, 0.5))})
+        rows[name] = row
+    df = pd.DataFrame.from_dict(rows, orient='index')
+    df.columns = pd.MultiIndex.from_tuples(df.columns)
+    df.index.name = 'PLAYER'
+    return df
+
+def summary_percentiles(summaries, columns, quantiles=(0.25, 0.75, 0.9)):
+    """Percentiles per player and column, shaped like the trials groupby quantile"""
+    index = pd.MultiIndex.from_product([list(summaries), quantiles], names=['PLAYER', None])
+    values = [[float(summary.quantile(col, q)) for col in columns]
+              for summary in summaries.values() for q in quantiles]
+    return pd.DataFrame(values, index=index, columns=columns)
+
+def analyze_simulation_results(team_1=None, team_2=None, date_str=None, players=None, columns=None):
+    """Analyze and summarize simulation results for a matchup"""
     
     # Use current teams and date if not specified
     if not team_1:
@@ -107,15 +298,38 @@ def analyze_simulation_results(team_1=None, team_2=None, date_str=None):
         team_2 = TEAM2  
     if not date_str:
         date_str = datetime.today().strftime('%Y-%m-%d')
+    columns = columns or ['PTS', 'REB', 'AST']
     
-    # Build path to combined results
+    # Build path to the matchup folder
     folder_name = f"{team_1.lower()}_vs_{team_2.lower()}_{date_str}"
     output_folder = os.path.join('sim_results', folder_name)
-    combined_path = os.path.join(output_folder, f"{team_1.lower()}_vs_{team_2.lower()}_combined_simulations.csv")
     
+    # Streaming runs leave summaries instead of trials
+    summaries = load_simulation_summaries(output_folder, team_1, team_2, players)
+    if summaries is not None:
+        print(f"Loaded streaming summaries from: {summaries_path(output_folder, team_1, team_2)}")
+        summary_df = summary_stats(summaries, columns)
+        print("SIMULATION SUMMARY STATISTICS")
+        print("="*60)
+        print(summary_df.round(2))
+        print("\n" + "="*60)
+        print("PERCENTILE ANALYSIS (25th, 75th, 90th)")
+        print("="*60)
+        print(summary_percentiles(summaries, columns).round(2))
+        return None, summary_df
+
+    # Older streaming runs only left a summary table
+    if (not os.path.exists(results_path(output_folder, team_1, team_2))
+            and os.path.exists(summary_path(output_folder, team_1, team_2))):
+        summary_df = pd.read_csv(summary_path(output_folder, team_1, team_2))
+        print("SIMULATION SUMMARY STATISTICS")
+        print("="*60)
+        print(summary_df.set_index(['PLAYER', 'STAT']).drop(columns='TEAM').round(2))
+        return None, summary_df
+
     try:
-        # Load CSV
-        df_combined = pd.read_csv(combined_path)
+        # Load results
+        df_combined, combined_path = load_simulation_results(output_folder, team_1, team_2, players, columns)
         print(f"Loaded simulation results from: {combined_path}")
         print(f"Total simulations: {len(df_combined)} rows")
         print(f"Players analyzed: {df_combined['PLAYER'].unique().tolist()}")
@@ -130,7 +344,7 @@ def analyze_simulation_results(team_1=None, team_2=None, date_str=None):
         print("\n" + "="*60)
         
         # View summary stats
-        summary_df = df_combined.groupby('PLAYER')[['PTS', 'REB', 'AST']].agg(['mean', 'std', 'min', 'max', 'median'])
+        summary_df = df_combined.groupby('PLAYER', observed=True)[columns].agg(['mean', 'std', 'min', 'max', 'median'])
         print("SIMULATION SUMMARY STATISTICS")
         print("="*60)
         print(summary_df.round(2))
@@ -139,50 +353,81 @@ def analyze_simulation_results(team_1=None, team_2=None, date_str=None):
         print("\n" + "="*60)
         print("PERCENTILE ANALYSIS (25th, 75th, 90th)")
         print("="*60)
-        percentile_df = df_combined.groupby('PLAYER')[['PTS', 'REB', 'AST']].quantile([0.25, 0.75, 0.9]).round(2)
+        percentile_df = df_combined.groupby('PLAYER', observed=True)[columns].quantile([0.25, 0.75, 0.9]).round(2)
         print(percentile_df)
         
         return df_combined, summary_df
         
     except FileNotFoundError:
-        print(f"Error: Could not find simulation results at {combined_path}")
+        print(f"Error: Could not find simulation results in {output_folder}")
         return None, None
     except Exception as e:
         print(f"Error analyzing results: {e}")
         return None, None
 
-def run_full_simulation():
+def report_outputs(games, output_folders):
+    for game, output_folder in zip(games, output_folders):
+        results_file = results_path(output_folder, game['team1'], game['team2'])
+        if SIMULATION_DEFAULTS['streaming']['enabled']:
+            print(f"\nSimulation complete! Summary saved in: {output_folder}")
+        elif os.path.exists(results_file):
+            print(f"\nSimulation complete! Results saved in: {output_folder}")
+            print(f"Simulation results: {results_file}")
+            
+        else:
+            print(f"\nSimulation of {game['team1']} vs {game['team2']} completed but no results were saved")
+
+def run_full_simulation(team_1=None, team_2=None, target_players=None):
     """Main function to run the complete simulation process"""
+    game = make_game(team_1, team_2, target_players)
     print("Starting WNBA player simulation...")
-    print(f"Simulating players from both {TEAM1} and {TEAM2}")
+    print(f"Simulating players from both {game['team1']} and {game['team2']}")
+
+    # Start the run with an empty in-memory store
+    run_store.clear()
+    projection_graph.reset()
     
     # Run simulations for all players
-    output_folder = save_simulation_results()
-    
-    # Combine all results
-    combined_file = combine_player_csvs(output_folder)
-    
-    if combined_file:
-        print(f"\nSimulation complete! Results saved in: {output_folder}")
-        print(f"Combined results: {combined_file}")
-        
-    else:
-        print("\nSimulation completed but no results to combine")
+    output_folder = run_games([game])[0]
+    report_outputs([game], [output_folder])
+
+    response_cache.report()
+    if SIMULATION_DEFAULTS['graph_report']:
+        projection_graph.dump()
     
     return output_folder
 
-def create_actual_results_template(team_1, team_2, date_str=None):
+def run_slate(games, date_str=None):
+    """Simulate a full day of games in one run, returning each game's output folder"""
+    print(f"Starting WNBA slate simulation of {len(games)} games...")
+
+    # One in-memory store for the whole slate, so shared data is fetched once
+    run_store.clear()
+    projection_graph.reset()
+
+    output_folders = run_games(games, date_str)
+    report_outputs(games, output_folders)
+
+    response_cache.report()
+    if SIMULATION_DEFAULTS['graph_report']:
+        projection_graph.dump()
+
+    return output_folders
+
+def create_actual_results_template(team_1, team_2, date_str=None, target_players=None):
     """Create a CSV template for entering actual game results"""
     
     if not date_str:
         date_str = datetime.today().strftime('%Y-%m-%d')
+    target_players = target_players or TARGETPLAYERS
+    players = target_players['TEAM1'] + target_players['TEAM2']
     
     template_df = pd.DataFrame({
-        'PLAYER': TARGETPLAYERS_FLAT,
-        'TEAM': [TEAM1 if get_player_team_assignment(player) == 'TEAM1' else TEAM2 for player in TARGETPLAYERS_FLAT],
-        'ACTUAL_PTS': [0.0] * len(TARGETPLAYERS_FLAT),
-        'ACTUAL_REB': [0.0] * len(TARGETPLAYERS_FLAT),
-        'ACTUAL_AST': [0.0] * len(TARGETPLAYERS_FLAT)
+        'PLAYER': players,
+        'TEAM': [team_1 if get_player_team_assignment(player, target_players) == 'TEAM1' else team_2 for player in players],
+        'ACTUAL_PTS': [0.0] * len(players),
+        'ACTUAL_REB': [0.0] * len(players),
+        'ACTUAL_AST': [0.0] * len(players)
     })
     
     folder_name = f"{team_1.lower()}_vs_{team_2.lower()}_{date_str}"
@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.model.monte_carlo import STATS, COMBOS, SimulationResult
+
+# Binary simulation output: one .npz per matchup holding a column per player and
+# stat. np.load reads entries lazily, so loaders only touch what they ask for
+
+def results_path(output_folder, team_1, team_2):
+    return os.path.join(output_folder, f"{team_1.lower()}_vs_{team_2.lower()}_simulations.npz")
+
+def column_key(index, stat):
+    return f"{index}/{stat}"
+
+def compact(values):
+    """int16 when every trial is a whole number in range, float32 otherwise"""
+    values = np.asarray(values)
+    if (len(values) and np.all(values == np.rint(values))
+            and values.min() >= np.iinfo(np.int16).min and values.max() <= np.iinfo(np.int16).max):
+        return values.astype(np.int16)
+    return values.astype(np.float32)
+
+def read_index(path):
+    """Player names and teams stored in a results file, in file order"""
+    with np.load(path) as data:
+        return data['players'].tolist(), data['teams'].tolist()
+
+def read_columns(path):
+    with np.load(path) as data:
+        players, teams = data['players'].tolist(), data['teams'].tolist()
+        columns = {key: data[key] for key in data.files if '/' in key}
+    return players, teams, columns
+
+def save_results(path, results, teams):
+    """Write {player name: SimulationResult} to path, keeping players already in the file"""
+    players, player_teams, columns = read_columns(path) if os.path.exists(path) else ([], [], {})
+    kept = [(name, team) for name, team in zip(players, player_teams) if name not in results]
+
+    arrays = {}
+    for i, (name, team) in enumerate(kept):
+        old = players.index(name)
+        for stat in STATS:
+            arrays[column_key(i, stat)] = columns[column_key(old, stat)]
+    for i, (name, result) in enumerate(results.items(), start=len(kept)):
+        for stat in STATS:
+            arrays[column_key(i, stat)] = compact(result[stat])
+
+    names = [name for name, _ in kept] + list(results)
+    team_names = [team for _, team in kept] + [teams[name] for name in results]
+
+    # Write to a temp file first so a crash never leaves a half-written file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, players=np.array(names), teams=np.array(team_names), **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+def load_results(path, players=None, columns=None):
+    """Trials for the requested players and stat columns as one DataFrame.
+
+    PLAYER and TEAM are categorical; stats keep their stored dtypes. Combo
+    columns (PRA, PR, PA) are summed from their stored parts as float32, as
+    SimulationResult.to_frame(combos=True) does.
+    """
+    columns = columns or STATS
+    unknown = [col for col in columns if col not in STATS and col not in COMBOS]
+    if unknown:
+        raise KeyError(f"Unknown stat columns: {unknown}")
+    frames = []
+    with np.load(path) as data:
+        names, teams = data['players'].tolist(), data['teams'].tolist()
+        for i, (name, team) in enumerate(zip(names, teams)):
+            if players is not None and name not in players:
+                continue
+            df = pd.DataFrame({
+                col: data[column_key(i, col)] if col in STATS
+                else sum(data[column_key(i, part)].astype(np.float32) for part in COMBOS[col])
+                for col in columns
+            })
+            df['PLAYER'] = name
+            df['TEAM'] = team
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=list(columns) + ['PLAYER', 'TEAM'])
+    df = pd.concat(frames, ignore_index=True)
+    df['PLAYER'] = pd.Categorical(df['PLAYER'], categories=[n for n in names if n in set(df['PLAYER'])])
+    df['TEAM'] = df['TEAM'].astype('category')
+    return df
+
+def load_player_results(path, players=None):
+    """{player name: SimulationResult} for the requested players"""
+    results = {}
+    with np.load(path) as data:
+        for i, name in enumerate(data['players'].tolist()):
+            if players is not None and name not in players:
+                continue
+            results[name] = SimulationResult(
+                np.column_stack([data[column_key(i, stat)] for stat in STATS]).astype(np.float32))
+    return results
+
+# Streaming runs keep no trials; their summaries (histogram counts and moments
+# per player and stat, combos included) go to a sibling .npz so the same
+# queries can be answered from them
+
+def summaries_path(output_folder, team_1, team_2):
+    return os.path.join(output_folder, f"{team_1.lower()}_vs_{team_2.lower()}_summaries.npz")
+
+def save_summaries(path, summaries, teams):
+    """Write {player name: SimulationSummary} to path, keeping players already in the file"""
+    existing = load_summaries(path) if os.path.exists(path) else {}
+    existing_teams = dict(zip(*read_index(path))) if existing else {}
+    kept = [name for name in existing if name not in summaries]
+
+    arrays = {}
+    names = kept + list(summaries)
+    for i, name in enumerate(names):
+        summary = summaries.get(name) or existing[name]
+        for stat, stat_summary in summary.summaries.items():
+            moments = stat_summary.moments
+            arrays[f"{column_key(i, stat)}/counts"] = stat_summary.histogram.counts
+            arrays[f"{column_key(i, stat)}/moments"] = np.array([moments.count, moments.mean, moments.m2])
+    team_names = [teams[name] if name in teams else existing_teams[name] for name in names]
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, players=np.array(names), teams=np.array(team_names), **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+def load_summaries(path, players=None):
+    """{player name: SimulationSummary} for the requested players"""
+    from src.model.accumulators import SimulationSummary
+
+    summaries = {}
+    with np.load(path) as data:
+        for i, name in enumerate(data['players'].tolist()):
+            if players is not None and name not in players:
+                continue
+            summary = SimulationSummary()
+            for stat, stat_summary in summary.summaries.items():
+                count, mean, m2 = data[f"{column_key(i, stat)}/moments"]
+                stat_summary.moments.count, stat_summary.moments.mean, stat_summary.moments.m2 = int(count), mean, m2
+                stat_summary.histogram.counts = data[f"{column_key(i, stat)}/counts"].astype(np.int64)
+            summaries[name] = summary
+    return summaries
@@ -0,0 +1,14 @@
+# Incremental update of the local season store
+import argparse
+
+from src.data.season_store import sync_season, store_path
+from src.utils.constants import SIMULATION_DEFAULTS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync WNBA game logs, rosters and team stats to the local season store")
+    parser.add_argument('--season', default=SIMULATION_DEFAULTS['season'], help="Season to sync (default: %(default)s)")
+    parser.add_argument('--full', action='store_true', help="Re-download the whole season instead of only new games")
+    args = parser.parse_args()
+
+    last_date = sync_season(args.season, full=args.full)
+    print(f"Store {store_path(args.season)} is up to date through {last_date.date() if last_date is not None else 'no games'}")
@@ -0,0 +1,54 @@
+from itertools import permutations
+
+import numpy as np
+import pandas as pd
+
+from src.model import assignment
+from src.model.assignment import linear_sum_assignment, solve_matchups
+
+def brute_force_cost(cost):
+    # Every injective assignment of the shorter side into the longer one
+    cost = cost if cost.shape[0] <= cost.shape[1] else cost.T
+    n, m = cost.shape
+    return min(cost[np.arange(n), list(cols)].sum() for cols in permutations(range(m), n))
+
+def test_linear_sum_assignment_matches_brute_force_on_rectangular_matrices():
+    rng = np.random.default_rng(0)
+    for shape in [(3, 5), (5, 3), (4, 4), (2, 6), (6, 1)]:
+        for _ in range(20):
+            cost = rng.integers(0, 50, size=shape).astype(float)
+            rows, cols = linear_sum_assignment(cost)
+            assert len(rows) == min(shape)
+            assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+            assert np.isclose(cost[rows, cols].sum(), brute_force_cost(cost))
+
+def test_solve_matchups_covers_every_player_on_unequal_rosters(monkeypatch):
+    # 13 home players against 12 opponents, with a star far above everyone else
+    home = pd.DataFrame({'PLAYER_ID': range(1, 14), 'NAME': ['Star'] + [f'H{i}' for i in range(2, 14)],
+                         'POS_CODE': [1] * 13, 'IMPACT': [38.0] + [10.0] * 12})
+    opp = pd.DataFrame({'PLAYER_ID': range(101, 113), 'NAME': [f'O{i}' for i in range(1, 13)],
+                        'POS_CODE': [1] * 12, 'IMPACT': [10.0] * 12})
+    profiles = {tuple(home['PLAYER_ID']): home, tuple(opp['PLAYER_ID']): opp}
+    monkeypatch.setattr(assignment, 'roster_profiles', lambda ids: profiles[tuple(ids)])
+
+    home_map, opp_map, _ = solve_matchups(list(home['PLAYER_ID']), list(opp['PLAYER_ID']), '2025-06-01')
+    assert set(home_map) == set(home['NAME'])
+    assert set(opp_map) == set(opp['NAME'])
+    assert home_map['Star'] in set(opp['NAME'])
+
+def test_matchup_context_keys_the_matching_on_the_slate_date(monkeypatch):
+    from src.data.store import run_store
+    from src.model import matchup_context
+    from src.model.graph import projection_graph
+
+    home = pd.DataFrame({'PLAYER_ID': [1, 2], 'NAME': ['H1', 'H2'], 'POS_CODE': [1, 2], 'IMPACT': [20.0, 10.0]})
+    opp = pd.DataFrame({'PLAYER_ID': [3, 4], 'NAME': ['O1', 'O2'], 'POS_CODE': [1, 2], 'IMPACT': [20.0, 10.0]})
+    profiles = {(1, 2): home, (3, 4): opp}
+    monkeypatch.setattr(assignment, 'roster_profiles', lambda ids: profiles[tuple(ids)])
+    monkeypatch.setattr(projection_graph, 'get', lambda *args: 80.0)
+
+    run_store.clear()
+    context = matchup_context.build_matchup_context([1, 2], [3, 4], 10, 20, '2025-06-01')
+    assert context.date_str == '2025-06-01'
+    assert ('matchups', (1, 2), (3, 4), '2025-06-01') in run_store._values
+    run_store.clear()